@@ -1,45 +1,130 @@
 import asyncio
 import random
-from datetime import datetime
 from typing import Optional
 import logging
 
 from .base_agent import BaseAgent
-from core.schemas import Signal, SignalType, News
-from core.message_bus import MessageBus
+from core.schemas import SignalType, News
+from core.message_bus import MessageBus, symbol_channel
+from core.timeutils import utcnow_iso
 
 logger = logging.getLogger(__name__)
 
+_BULLISH = SignalType.BULLISH.to_str()
+_BEARISH = SignalType.BEARISH.to_str()
+_NEUTRAL = SignalType.NEUTRAL.to_str()
+
+_SAMPLE_RATE = 0.3
+_SAMPLE_TABLE_MASK = 1023
+
+
+def _build_sample_table(rate: float, size: int, seed: int = 0) -> tuple[bool, ...]:
+    rng = random.Random(seed)
+    return tuple(rng.random() < rate for _ in range(size))
+
+
+_SAMPLE_TABLE = _build_sample_table(_SAMPLE_RATE, _SAMPLE_TABLE_MASK + 1)
+
 
 class AnalystAgent(BaseAgent):
+    __slots__ = (
+        "symbols",
+        "news_cache",
+        "signal_count",
+        "_tick_counter",
+        "batch_enabled",
+        "batch_size",
+        "batch_interval",
+        "_signal_buffer",
+        "_flush_handle",
+        "_flush_task"
+    )
+    
     def __init__(
         self,
         agent_id: str,
         message_bus: MessageBus,
         symbols: list[str],
+        batch_enabled: bool = True,
+        batch_size: int = 64,
+        batch_interval: float = 0.005,
         log_level: str = "INFO"
     ):
         super().__init__(agent_id, message_bus, log_level)
-        self.symbols = symbols
+        self.symbols = frozenset(symbols)
         self.news_cache: list[News] = []
         self.signal_count = 0
+        self._tick_counter = 0
+        
+        self.batch_enabled = batch_enabled
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self._signal_buffer: list[dict] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._flush_task: Optional[asyncio.Task] = None
     
     async def _setup_subscriptions(self) -> None:
-        await self.subscribe("market_data", self._on_market_update)
-        await self.subscribe("news_feed", self._on_news)
+        for symbol in self.symbols:
+            await self.subscribe(
+                symbol_channel("market_data", symbol),
+                self._on_market_update,
+                message_type="market_update"
+            )
+        await self.subscribe(
+            "news_feed", self._on_news, message_type="news_item"
+        )
     
     async def _run(self) -> None:
-        while self._running:
-            await asyncio.sleep(1)
+        await self._stop_event.wait()
     
-    async def _on_market_update(self, message: dict) -> None:
-        if message.get("type") != "market_update":
+    async def stop(self) -> None:
+        await self._flush_signals()
+        await super().stop()
+    
+    def _schedule_flush(self) -> None:
+        self._flush_handle = None
+        self._flush_task = asyncio.get_running_loop().create_task(self._flush_signals())
+    
+    async def _emit_signal(self, payload: dict) -> None:
+        if not self.batch_enabled:
+            await self.publish(symbol_channel("signals", payload["symbol"]), payload)
             return
         
-        symbol = message.get("symbol")
-        if symbol not in self.symbols:
+        self._signal_buffer.append(payload)
+        if len(self._signal_buffer) >= self.batch_size:
+            await self._flush_signals()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(
+                self.batch_interval, self._schedule_flush
+            )
+    
+    async def _flush_signals(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        
+        if not self._signal_buffer:
             return
         
+        items = self._signal_buffer
+        self._signal_buffer = []
+        await self.publish(
+            "signals_batch",
+            {
+                "type": "signals_batch",
+                "agent_id": self.agent_id,
+                "items": items
+            }
+        )
+    
+    async def _on_market_tick(self, message: dict) -> None:
+        try:
+            await self._flush_signals()
+        finally:
+            await super()._on_market_tick(message)
+    
+    async def _on_market_update(self, message: dict) -> None:
+        symbol = message.get("symbol")
         close_price = message.get("close")
         open_price = message.get("open")
         
@@ -48,13 +133,11 @@ class AnalystAgent(BaseAgent):
         
         price_change = (close_price - open_price) / open_price
         
-        if random.random() < 0.3:
+        self._tick_counter = (self._tick_counter + 1) & _SAMPLE_TABLE_MASK
+        if _SAMPLE_TABLE[self._tick_counter]:
             await self._generate_signal(symbol, price_change, message.get("timestamp"))
     
     async def _on_news(self, message: dict) -> None:
-        if message.get("type") != "news_item":
-            return
-        
         try:
             news = News(**message.get("data", {}))
             self.news_cache.append(news)
@@ -75,48 +158,40 @@ class AnalystAgent(BaseAgent):
             return
         
         if price_change > 0.02:
-            signal_type = SignalType.BULLISH
-            confidence = min(0.9, 0.5 + abs(price_change) * 10)
-            reasoning = f"Strong upward momentum: {price_change*100:.2f}%"
+            signal_type = _BULLISH
+            confidence = min(0.9, 0.5 + price_change * 10)
+            reasoning_prefix = "Strong upward momentum"
         elif price_change < -0.02:
-            signal_type = SignalType.BEARISH
-            confidence = min(0.9, 0.5 + abs(price_change) * 10)
-            reasoning = f"Downward pressure: {price_change*100:.2f}%"
+            signal_type = _BEARISH
+            confidence = min(0.9, 0.5 - price_change * 10)
+            reasoning_prefix = "Downward pressure"
         else:
-            signal_type = SignalType.NEUTRAL
+            signal_type = _NEUTRAL
             confidence = 0.3
-            reasoning = f"Minimal movement: {price_change*100:.2f}%"
+            reasoning_prefix = "Minimal movement"
+        reasoning = f"{reasoning_prefix}: {price_change*100:.2f}%"
         
         self.signal_count += 1
-        signal = Signal(
-            id=f"{self.agent_id}_signal_{self.signal_count}",
-            timestamp=datetime.fromisoformat(timestamp) if timestamp else datetime.utcnow(),
-            agent_id=self.agent_id,
-            symbol=symbol,
-            signal_type=signal_type,
-            confidence=confidence,
-            reasoning=reasoning
-        )
+        signal_id = f"{self.agent_id}_signal_{self.signal_count}"
         
-        await self.publish(
-            "signals",
+        await self._emit_signal(
             {
                 "type": "signal",
-                "signal_id": signal.id,
-                "timestamp": signal.timestamp.isoformat(),
-                "agent_id": signal.agent_id,
-                "symbol": signal.symbol,
-                "signal_type": signal.signal_type.value,
-                "confidence": signal.confidence,
-                "reasoning": signal.reasoning
+                "signal_id": signal_id,
+                "timestamp": timestamp or utcnow_iso(),
+                "agent_id": self.agent_id,
+                "symbol": symbol,
+                "signal_type": signal_type,
+                "confidence": confidence,
+                "reasoning": reasoning
             }
         )
         
         self.logger.info(
             f"Generated signal",
-            signal_id=signal.id,
+            signal_id=signal_id,
             symbol=symbol,
-            type=signal_type.value,
+            type=signal_type,
             confidence=f"{confidence:.2f}"
         )
     
@@ -125,42 +200,33 @@ class AnalystAgent(BaseAgent):
             return
         
         if news.sentiment_score > 0.3:
-            signal_type = SignalType.BULLISH
+            signal_type = _BULLISH
             confidence = min(0.85, 0.5 + news.sentiment_score * 0.5)
         elif news.sentiment_score < -0.3:
-            signal_type = SignalType.BEARISH
-            confidence = min(0.85, 0.5 + abs(news.sentiment_score) * 0.5)
+            signal_type = _BEARISH
+            confidence = min(0.85, 0.5 - news.sentiment_score * 0.5)
         else:
             return
         
         self.signal_count += 1
-        signal = Signal(
-            id=f"{self.agent_id}_signal_{self.signal_count}",
-            timestamp=datetime.utcnow(),
-            agent_id=self.agent_id,
-            symbol=news.symbol,
-            signal_type=signal_type,
-            confidence=confidence,
-            reasoning=f"News sentiment: {news.headline[:50]}..."
-        )
+        signal_id = f"{self.agent_id}_signal_{self.signal_count}"
         
-        await self.publish(
-            "signals",
+        await self._emit_signal(
             {
                 "type": "signal",
-                "signal_id": signal.id,
-                "timestamp": signal.timestamp.isoformat(),
-                "agent_id": signal.agent_id,
-                "symbol": signal.symbol,
-                "signal_type": signal.signal_type.value,
-                "confidence": signal.confidence,
-                "reasoning": signal.reasoning
+                "signal_id": signal_id,
+                "timestamp": utcnow_iso(),
+                "agent_id": self.agent_id,
+                "symbol": news.symbol,
+                "signal_type": signal_type,
+                "confidence": confidence,
+                "reasoning": f"News sentiment: {news.headline[:50]}..."
             }
         )
         
         self.logger.info(
             f"Generated news-based signal",
-            signal_id=signal.id,
+            signal_id=signal_id,
             symbol=news.symbol,
-            type=signal_type.value
+            type=signal_type
         )
\ No newline at end of file
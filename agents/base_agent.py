@@ -11,6 +11,16 @@ logger = logging.getLogger(__name__)
 
 
 class BaseAgent(ABC):
+    __slots__ = (
+        "agent_id",
+        "message_bus",
+        "logger",
+        "_running",
+        "_task",
+        "_stop_event",
+        "tick_done"
+    )
+    
     def __init__(
         self,
         agent_id: str,
@@ -23,6 +33,8 @@ class BaseAgent(ABC):
         
         self._running = False
         self._task: Optional[asyncio.Task] = None
+        self._stop_event = asyncio.Event()
+        self.tick_done = asyncio.Event()
     
     async def start(self) -> None:
         if self._running:
@@ -30,12 +42,15 @@ class BaseAgent(ABC):
             return
         
         self._running = True
+        self._stop_event.clear()
         await self._setup_subscriptions()
-        self._task = asyncio.create_task(self._run())
+        await self.subscribe("market_tick", self._on_market_tick, message_type="market_tick")
+        self._task = asyncio.get_running_loop().create_task(self._run())
         self.logger.info(f"Agent {self.agent_id} started")
     
     async def stop(self) -> None:
         self._running = False
+        self._stop_event.set()
         if self._task:
             self._task.cancel()
             try:
@@ -52,14 +67,25 @@ class BaseAgent(ABC):
     async def _run(self) -> None:
         pass
     
+    async def _on_market_tick(self, message: dict) -> None:
+        self.tick_done.set()
+    
+    async def drain(self) -> None:
+        pass
+    
     async def publish(self, channel: str, message: dict) -> None:
         try:
             await self.message_bus.publish(channel, message)
         except Exception as e:
             self.logger.error(f"Failed to publish message: {e}", channel=channel)
     
-    async def subscribe(self, channel: str, callback) -> None:
+    async def subscribe(
+        self, 
+        channel: str, 
+        callback, 
+        message_type: Optional[str] = None
+    ) -> None:
         try:
-            await self.message_bus.subscribe(channel, callback)
+            await self.message_bus.subscribe(channel, callback, message_type)
         except Exception as e:
             self.logger.error(f"Failed to subscribe to channel: {e}", channel=channel)
\ No newline at end of file
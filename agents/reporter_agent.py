@@ -1,32 +1,95 @@
 import asyncio
-import json
-from datetime import datetime
+import csv
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List
+from typing import BinaryIO, Dict, Optional, TextIO
 import logging
 
+import orjson
+
 from .base_agent import BaseAgent
 from core.message_bus import MessageBus
+from core.timeutils import utcnow_iso
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass(slots=True)
+class PortfolioSnapshot:
+    date: Optional[str] = None
+    total_value: float = 0.0
+    realized_pnl: float = 0.0
+    unrealized_pnl: float = 0.0
+
+
+_RECORD_KINDS = ("trades", "stop_losses", "rejected_orders")
+
+
+def _write_json_report(path: Path, report: dict, records: dict[str, Optional[Path]]) -> None:
+    with open(path, 'wb') as f:
+        f.write(orjson.dumps(report, option=orjson.OPT_INDENT_2)[:-2])
+        for kind, records_path in records.items():
+            f.write(b',\n  ' + orjson.dumps(kind) + b': [')
+            separator = b'\n    '
+            if records_path is not None:
+                with open(records_path, 'rb') as lines:
+                    for line in lines:
+                        record = orjson.dumps(orjson.loads(line), option=orjson.OPT_INDENT_2)
+                        f.write(separator + record.replace(b'\n', b'\n    '))
+                        separator = b',\n    '
+            f.write(b']' if separator == b'\n    ' else b'\n  ]')
+        f.write(b'\n}')
+
+
 class ReporterAgent(BaseAgent):
+    __slots__ = (
+        "reports_dir",
+        "trades_csv_path",
+        "records_dir",
+        "_csv_file",
+        "_csv_writer",
+        "_record_files",
+        "_writer",
+        "max_batch_size",
+        "_record_queue",
+        "portfolio_snapshots",
+        "_dd_peak",
+        "_dd_max",
+        "daily_stats"
+    )
+    
     def __init__(
         self,
         agent_id: str,
         message_bus: MessageBus,
         reports_dir: Path = Path("./reports"),
+        max_snapshots: int = 1000,
+        max_pending_records: int = 100_000,
+        max_batch_size: int = 1000,
         log_level: str = "INFO"
     ):
         super().__init__(agent_id, message_bus, log_level)
         self.reports_dir = reports_dir
         self.reports_dir.mkdir(parents=True, exist_ok=True)
+        self.trades_csv_path = self.reports_dir / "trades_history.csv"
+        self.records_dir = self.reports_dir / "records"
+        self.records_dir.mkdir(parents=True, exist_ok=True)
+        
+        self._csv_file: Optional[TextIO] = None
+        self._csv_writer: Optional[csv.DictWriter] = None
+        self._record_files: Dict[str, BinaryIO] = {}
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"{agent_id}-writer")
         
-        self.trades: List[dict] = []
-        self.stop_losses: List[dict] = []
-        self.risk_decisions: List[dict] = []
-        self.portfolio_snapshots: List[dict] = []
+        self.max_batch_size = max_batch_size
+        self._record_queue: asyncio.Queue[tuple[str, dict]] = asyncio.Queue(
+            maxsize=max_pending_records
+        )
+        self.portfolio_snapshots: deque[PortfolioSnapshot] = deque(maxlen=max_snapshots)
+        
+        self._dd_peak = 0.0
+        self._dd_max = 0.0
         
         self.daily_stats: Dict[str, any] = {
             "total_trades": 0,
@@ -38,20 +101,81 @@ class ReporterAgent(BaseAgent):
         }
     
     async def _setup_subscriptions(self) -> None:
-        await self.subscribe("trades", self._on_trade)
-        await self.subscribe("risk_decisions", self._on_risk_decision)
-        await self.subscribe("stop_loss_alerts", self._on_stop_loss)
-        await self.subscribe("portfolio_update", self._on_portfolio_update)
+        await self.subscribe(
+            "trades", self._on_trade, message_type="trade_executed"
+        )
+        await self.subscribe(
+            "risk_decisions", self._on_risk_decision, message_type="risk_decision"
+        )
+        await self.subscribe(
+            "stop_loss_alerts", self._on_stop_loss, message_type="stop_loss"
+        )
+        await self.subscribe(
+            "portfolio_update", self._on_portfolio_update, message_type="portfolio_snapshot"
+        )
     
     async def _run(self) -> None:
         while self._running:
-            await asyncio.sleep(1)
+            batch = self._take_pending([await self._record_queue.get()])
+            await self._in_writer(self._write_records, batch)
     
-    async def _on_trade(self, message: dict) -> None:
-        if message.get("type") != "trade_executed":
-            return
+    async def stop(self) -> None:
+        await super().stop()
+        await self._flush_records()
+        await self._in_writer(self._close_files)
+        self._writer.shutdown(wait=False)
+    
+    def _in_writer(self, func, *args) -> asyncio.Future:
+        return asyncio.get_running_loop().run_in_executor(self._writer, func, *args)
+    
+    def _close_files(self) -> None:
+        for f in self._record_files.values():
+            f.close()
+        self._record_files.clear()
         
-        self.trades.append({
+        if self._csv_file:
+            self._csv_file.close()
+            self._csv_file = None
+            self._csv_writer = None
+    
+    def _take_pending(self, batch: list[tuple[str, dict]]) -> list[tuple[str, dict]]:
+        while len(batch) < self.max_batch_size:
+            try:
+                batch.append(self._record_queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        return batch
+    
+    def _write_records(self, batch: list[tuple[str, dict]]) -> None:
+        for kind, record in batch:
+            if kind == "trades":
+                self._append_csv_row(record)
+            
+            f = self._record_files.get(kind)
+            if f is None:
+                f = open(self.records_dir / f"{kind}.jsonl", 'wb')
+                self._record_files[kind] = f
+            f.write(orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE))
+    
+    async def _flush_records(self) -> None:
+        while not self._record_queue.empty():
+            await self._in_writer(self._write_records, self._take_pending([]))
+        await self._in_writer(self._flush_files)
+    
+    def _flush_files(self) -> None:
+        for f in self._record_files.values():
+            f.flush()
+        if self._csv_file:
+            self._csv_file.flush()
+    
+    def _record_paths(self) -> dict[str, Optional[Path]]:
+        return {
+            kind: self.records_dir / f"{kind}.jsonl" if kind in self._record_files else None
+            for kind in _RECORD_KINDS
+        }
+    
+    async def _on_trade(self, message: dict) -> None:
+        trade = {
             "trade_id": message.get("trade_id"),
             "order_id": message.get("order_id"),
             "timestamp": message.get("timestamp"),
@@ -61,7 +185,8 @@ class ReporterAgent(BaseAgent):
             "execution_price": message.get("execution_price"),
             "commission": message.get("commission"),
             "trader_id": message.get("trader_id")
-        })
+        }
+        await self._record_queue.put(("trades", trade))
         
         self.daily_stats["total_trades"] += 1
         
@@ -70,58 +195,73 @@ class ReporterAgent(BaseAgent):
         elif message.get("side") == "SELL":
             self.daily_stats["sell_orders"] += 1
         
-        self.logger.debug(f"Trade recorded: {message.get('trade_id')}")
+        if self.logger.is_enabled_for(logging.DEBUG):
+            self.logger.debug("Trade recorded", trade_id=message.get("trade_id"))
     
     async def _on_risk_decision(self, message: dict) -> None:
-        if message.get("type") != "risk_decision":
-            return
-        
-        self.risk_decisions.append({
-            "order_id": message.get("order_id"),
-            "approved": message.get("approved"),
-            "reason": message.get("reason"),
-            "timestamp": message.get("timestamp")
-        })
-        
         if message.get("approved"):
             self.daily_stats["approved_orders"] += 1
-        else:
-            self.daily_stats["rejected_orders"] += 1
-    
-    async def _on_stop_loss(self, message: dict) -> None:
-        if message.get("type") != "stop_loss":
             return
         
-        self.stop_losses.append({
-            "trader_id": message.get("trader_id"),
-            "symbol": message.get("symbol"),
-            "quantity": message.get("quantity"),
-            "avg_cost": message.get("avg_cost"),
-            "current_price": message.get("current_price"),
-            "loss_percent": message.get("loss_percent"),
-            "timestamp": message.get("timestamp")
-        })
+        self.daily_stats["rejected_orders"] += 1
+        await self._record_queue.put((
+            "rejected_orders",
+            {
+                "order_id": message.get("order_id"),
+                "approved": message.get("approved"),
+                "reason": message.get("reason"),
+                "timestamp": message.get("timestamp")
+            }
+        ))
+    
+    async def _on_stop_loss(self, message: dict) -> None:
+        await self._record_queue.put((
+            "stop_losses",
+            {
+                "trader_id": message.get("trader_id"),
+                "symbol": message.get("symbol"),
+                "quantity": message.get("quantity"),
+                "avg_cost": message.get("avg_cost"),
+                "current_price": message.get("current_price"),
+                "loss_percent": message.get("loss_percent"),
+                "timestamp": message.get("timestamp")
+            }
+        ))
         
         self.daily_stats["stop_losses_triggered"] += 1
         
         self.logger.info(f"Stop loss recorded for {message.get('symbol')}")
     
     async def _on_portfolio_update(self, message: dict) -> None:
-        if message.get("type") != "portfolio_snapshot":
-            return
+        data = message.get("data", {})
+        snapshot = PortfolioSnapshot(
+            date=data.get("date"),
+            total_value=data.get("total_value", 0.0),
+            realized_pnl=data.get("realized_pnl", 0.0),
+            unrealized_pnl=data.get("unrealized_pnl", 0.0)
+        )
+        self.portfolio_snapshots.append(snapshot)
         
-        self.portfolio_snapshots.append(message.get("data", {}))
+        value = snapshot.total_value
+        if value > self._dd_peak:
+            self._dd_peak = value
+        elif self._dd_peak > 0:
+            drawdown = (self._dd_peak - value) / self._dd_peak
+            if drawdown > self._dd_max:
+                self._dd_max = drawdown
     
     async def generate_daily_report(self, simulation_date: str) -> dict:
+        await self._flush_records()
+        
         total_value = 0.0
         realized_pnl = 0.0
         unrealized_pnl = 0.0
         
         if self.portfolio_snapshots:
             latest_snapshot = self.portfolio_snapshots[-1]
-            total_value = latest_snapshot.get("total_value", 0.0)
-            realized_pnl = latest_snapshot.get("realized_pnl", 0.0)
-            unrealized_pnl = latest_snapshot.get("unrealized_pnl", 0.0)
+            total_value = latest_snapshot.total_value
+            realized_pnl = latest_snapshot.realized_pnl
+            unrealized_pnl = latest_snapshot.unrealized_pnl
         
         rejected_orders_pct = 0.0
         total_orders = self.daily_stats["approved_orders"] + self.daily_stats["rejected_orders"]
@@ -132,7 +272,7 @@ class ReporterAgent(BaseAgent):
         
         report = {
             "date": simulation_date,
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": utcnow_iso(),
             "summary": {
                 "total_portfolio_value": total_value,
                 "realized_pnl": realized_pnl,
@@ -148,52 +288,25 @@ class ReporterAgent(BaseAgent):
                 "rejected_orders_pct": rejected_orders_pct,
                 "stop_losses_triggered": self.daily_stats["stop_losses_triggered"],
                 "max_drawdown": max_drawdown
-            },
-            "trades": self.trades,
-            "stop_losses": self.stop_losses,
-            "rejected_orders": [
-                dec for dec in self.risk_decisions if not dec.get("approved")
-            ]
+            }
         }
         
         report_path = self.reports_dir / "daily_pnl.json"
-        with open(report_path, 'w') as f:
-            json.dump(report, f, indent=2)
+        await self._in_writer(_write_json_report, report_path, report, self._record_paths())
+        if self._csv_file:
+            self.logger.info(f"CSV report generated: {self.trades_csv_path}")
         
         self.logger.info(f"Daily report generated: {report_path}")
         
-        csv_report_path = self.reports_dir / "trades_history.csv"
-        await self._generate_csv_report(csv_report_path)
-        
         return report
     
     def _calculate_max_drawdown(self) -> float:
-        if len(self.portfolio_snapshots) < 2:
-            return 0.0
-        
-        values = [snap.get("total_value", 0) for snap in self.portfolio_snapshots]
-        peak = values[0]
-        max_dd = 0.0
-        
-        for value in values:
-            if value > peak:
-                peak = value
-            dd = (peak - value) / peak if peak > 0 else 0
-            max_dd = max(max_dd, dd)
-        
-        return max_dd
+        return self._dd_max
     
-    async def _generate_csv_report(self, csv_path: Path) -> None:
-        if not self.trades:
-            return
-        
-        import csv
-        
-        with open(csv_path, 'w', newline='') as f:
-            if self.trades:
-                fieldnames = self.trades[0].keys()
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()
-                writer.writerows(self.trades)
+    def _append_csv_row(self, trade: dict) -> None:
+        if self._csv_writer is None:
+            self._csv_file = open(self.trades_csv_path, 'w', newline='')
+            self._csv_writer = csv.DictWriter(self._csv_file, fieldnames=trade.keys())
+            self._csv_writer.writeheader()
         
-        self.logger.info(f"CSV report generated: {csv_path}")
\ No newline at end of file
+        self._csv_writer.writerow(trade)
@@ -1,63 +1,143 @@
 import asyncio
-from datetime import datetime
+import zlib
+from collections import defaultdict
+from dataclasses import dataclass
 from typing import Dict
 import logging
 
 from .base_agent import BaseAgent
-from core.schemas import OrderSide
-from core.message_bus import MessageBus
+from core.message_bus import MessageBus, symbol_channel
+from core.timeutils import utcnow_iso
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass(slots=True)
+class TrackedPosition:
+    trader_id: str
+    symbol: str
+    quantity: int = 0
+    avg_cost: float = 0.0
+
+
 class RiskManagerAgent(BaseAgent):
+    __slots__ = (
+        "symbols",
+        "initial_portfolio_value",
+        "max_position_size",
+        "stop_loss_percent",
+        "max_portfolio_risk",
+        "current_positions",
+        "current_prices",
+        "trader_cash",
+        "_default_cash",
+        "_max_allowed_exposure",
+        "_position_qty_by_symbol",
+        "_total_exposure",
+        "approved_count",
+        "rejected_count",
+        "worker_count",
+        "_order_queues",
+        "_workers"
+    )
+    
     def __init__(
         self,
         agent_id: str,
         message_bus: MessageBus,
+        symbols: list[str],
         initial_portfolio_value: float = 1000000.0,
         max_position_size: float = 50000.0,
         stop_loss_percent: float = 0.05,
         max_portfolio_risk: float = 0.20,
+        worker_count: int = 1,
         log_level: str = "INFO"
     ):
         super().__init__(agent_id, message_bus, log_level)
+        self.symbols = frozenset(symbols)
         self.initial_portfolio_value = initial_portfolio_value
         self.max_position_size = max_position_size
         self.stop_loss_percent = stop_loss_percent
         self.max_portfolio_risk = max_portfolio_risk
         
-        self.current_positions: Dict[str, Dict] = {}
+        self.current_positions: Dict[str, TrackedPosition] = {}
         self.current_prices: Dict[str, float] = {}
         self.trader_cash: Dict[str, float] = {}
+        self._default_cash = initial_portfolio_value / 4
+        self._max_allowed_exposure = initial_portfolio_value * max_portfolio_risk
+        
+        self._position_qty_by_symbol: Dict[str, int] = defaultdict(int)
+        self._total_exposure = 0.0
         
         self.approved_count = 0
         self.rejected_count = 0
+        
+        self.worker_count = worker_count
+        self._order_queues: list[asyncio.Queue[dict]] = [
+            asyncio.Queue() for _ in range(worker_count)
+        ]
+        self._workers: list[asyncio.Task] = []
     
     async def _setup_subscriptions(self) -> None:
-        await self.subscribe("orders", self._on_order_request)
-        await self.subscribe("market_data", self._on_market_update)
-        await self.subscribe("trades", self._on_trade_executed)
+        await self.subscribe(
+            "orders", self._enqueue_order, message_type="order_request"
+        )
+        for symbol in self.symbols:
+            await self.subscribe(
+                symbol_channel("market_data", symbol),
+                self._on_market_update,
+                message_type="market_update"
+            )
+        await self.subscribe(
+            "trades", self._on_trade_executed, message_type="trade_executed"
+        )
     
     async def _run(self) -> None:
-        while self._running:
+        loop = asyncio.get_running_loop()
+        self._workers = [loop.create_task(self._order_worker(queue)) for queue in self._order_queues]
+        try:
+            await self._stop_event.wait()
+        finally:
+            for worker in self._workers:
+                worker.cancel()
+            await asyncio.gather(*self._workers, return_exceptions=True)
+    
+    async def _on_market_tick(self, message: dict) -> None:
+        try:
             await self._check_stop_losses()
-            await asyncio.sleep(2)
+        finally:
+            await super()._on_market_tick(message)
+    
+    async def drain(self) -> None:
+        await asyncio.gather(*(queue.join() for queue in self._order_queues))
+    
+    async def _enqueue_order(self, message: dict) -> None:
+        symbol = message.get("symbol") or ""
+        shard = zlib.crc32(symbol.encode()) % self.worker_count
+        self._order_queues[shard].put_nowait(message)
+    
+    async def _order_worker(self, queue: asyncio.Queue[dict]) -> None:
+        while True:
+            message = await queue.get()
+            try:
+                await self._on_order_request(message)
+            except Exception as e:
+                self.logger.error(f"Failed to process order request: {e}")
+            finally:
+                queue.task_done()
     
     async def _on_market_update(self, message: dict) -> None:
-        if message.get("type") != "market_update":
-            return
-        
         symbol = message.get("symbol")
         close_price = message.get("close")
         
         if symbol and close_price:
+            held_quantity = self._position_qty_by_symbol.get(symbol, 0)
+            if held_quantity:
+                previous_price = self.current_prices.get(symbol, 0.0)
+                self._total_exposure += held_quantity * (close_price - previous_price)
             self.current_prices[symbol] = close_price
     
     async def _on_order_request(self, message: dict) -> None:
-        if message.get("type") != "order_request":
-            return
-        
         order_id = message.get("order_id")
         trader_id = message.get("trader_id")
         symbol = message.get("symbol")
@@ -94,7 +174,7 @@ class RiskManagerAgent(BaseAgent):
                 "order_id": order_id,
                 "approved": approved,
                 "reason": reason,
-                "timestamp": datetime.utcnow().isoformat()
+                "timestamp": utcnow_iso()
             }
         )
     
@@ -115,7 +195,7 @@ class RiskManagerAgent(BaseAgent):
         if order_value > self.max_position_size:
             return False, f"Order value ${order_value:.2f} exceeds max position size ${self.max_position_size:.2f}"
         
-        trader_cash = self.trader_cash.get(trader_id, self.initial_portfolio_value / 4)
+        trader_cash = self._cash(trader_id)
         
         if side == "BUY":
             if order_value > trader_cash:
@@ -123,17 +203,15 @@ class RiskManagerAgent(BaseAgent):
         
         elif side == "SELL":
             trader_key = f"{trader_id}_{symbol}"
-            current_position = self.current_positions.get(trader_key, {}).get("quantity", 0)
+            tracked = self.current_positions.get(trader_key)
+            current_position = tracked.quantity if tracked else 0
             
             if quantity > current_position:
                 return False, f"Insufficient shares: trying to sell {quantity}, have {current_position}"
         
-        total_exposure = sum(
-            pos.get("quantity", 0) * self.current_prices.get(pos.get("symbol", ""), 0)
-            for pos in self.current_positions.values()
-        )
+        total_exposure = self._total_exposure
         
-        max_allowed_exposure = self.initial_portfolio_value * self.max_portfolio_risk
+        max_allowed_exposure = self._max_allowed_exposure
         
         if side == "BUY" and (total_exposure + order_value) > max_allowed_exposure:
             return False, f"Portfolio risk limit exceeded: ${total_exposure + order_value:.2f} > ${max_allowed_exposure:.2f}"
@@ -141,9 +219,6 @@ class RiskManagerAgent(BaseAgent):
         return True, "Order approved"
     
     async def _on_trade_executed(self, message: dict) -> None:
-        if message.get("type") != "trade_executed":
-            return
-        
         trader_id = message.get("trader_id")
         symbol = message.get("symbol")
         side = message.get("side")
@@ -154,53 +229,75 @@ class RiskManagerAgent(BaseAgent):
         trader_key = f"{trader_id}_{symbol}"
         
         if trader_key not in self.current_positions:
-            self.current_positions[trader_key] = {
-                "trader_id": trader_id,
-                "symbol": symbol,
-                "quantity": 0,
-                "avg_cost": 0.0
-            }
+            self.current_positions[trader_key] = TrackedPosition(
+                trader_id=trader_id,
+                symbol=symbol
+            )
         
         position = self.current_positions[trader_key]
+        previous_quantity = position.quantity
         
         if side == "BUY":
-            total_cost = (position["quantity"] * position["avg_cost"]) + (quantity * execution_price)
-            position["quantity"] += quantity
-            position["avg_cost"] = total_cost / position["quantity"] if position["quantity"] > 0 else 0
+            total_cost = (position.quantity * position.avg_cost) + (quantity * execution_price)
+            position.quantity += quantity
+            position.avg_cost = total_cost / position.quantity if position.quantity > 0 else 0
             
-            current_cash = self.trader_cash.get(trader_id, self.initial_portfolio_value / 4)
+            current_cash = self._cash(trader_id)
             self.trader_cash[trader_id] = current_cash - (execution_price * quantity + commission)
         
         elif side == "SELL":
-            position["quantity"] -= quantity
-            if position["quantity"] <= 0:
+            position.quantity -= quantity
+            if position.quantity <= 0:
                 del self.current_positions[trader_key]
             
-            current_cash = self.trader_cash.get(trader_id, self.initial_portfolio_value / 4)
+            current_cash = self._cash(trader_id)
             self.trader_cash[trader_id] = current_cash + (execution_price * quantity - commission)
         
-        self.logger.debug(
-            f"Position updated",
-            trader_id=trader_id,
-            symbol=symbol,
-            side=side,
-            new_quantity=position.get("quantity", 0) if trader_key in self.current_positions else 0
-        )
+        new_quantity = position.quantity if trader_key in self.current_positions else 0
+        self._adjust_exposure(symbol, new_quantity - previous_quantity)
+        
+        if self.logger.is_enabled_for(logging.DEBUG):
+            self.logger.debug(
+                "Position updated",
+                trader_id=trader_id,
+                symbol=symbol,
+                side=side,
+                new_quantity=new_quantity
+            )
+    
+    def _cash(self, trader_id: str) -> float:
+        return self.trader_cash.setdefault(trader_id, self._default_cash)
+    
+    def _adjust_exposure(self, symbol: str, quantity_delta: int) -> None:
+        if not quantity_delta:
+            return
+        
+        self._position_qty_by_symbol[symbol] += quantity_delta
+        self._total_exposure += quantity_delta * self.current_prices.get(symbol, 0.0)
+        
+        if not self._position_qty_by_symbol[symbol]:
+            del self._position_qty_by_symbol[symbol]
+            if not self._position_qty_by_symbol:
+                self._total_exposure = 0.0
     
     async def _check_stop_losses(self) -> None:
-        for trader_key, position in list(self.current_positions.items()):
-            symbol = position["symbol"]
-            quantity = position["quantity"]
-            avg_cost = position["avg_cost"]
+        prices = self.current_prices
+        threshold = self.stop_loss_percent
+        for position in tuple(self.current_positions.values()):
+            quantity = position.quantity
+            if quantity <= 0:
+                continue
             
-            if symbol not in self.current_prices or quantity <= 0:
+            symbol = position.symbol
+            current_price = prices.get(symbol)
+            if current_price is None:
                 continue
             
-            current_price = self.current_prices[symbol]
+            avg_cost = position.avg_cost
             loss_percent = (avg_cost - current_price) / avg_cost
             
-            if loss_percent > self.stop_loss_percent:
-                trader_id = position["trader_id"]
+            if loss_percent > threshold:
+                trader_id = position.trader_id
                 
                 self.logger.warning(
                     f"STOP LOSS triggered",
@@ -221,6 +318,6 @@ class RiskManagerAgent(BaseAgent):
                         "avg_cost": avg_cost,
                         "current_price": current_price,
                         "loss_percent": loss_percent,
-                        "timestamp": datetime.utcnow().isoformat()
+                        "timestamp": utcnow_iso()
                     }
                 )
\ No newline at end of file
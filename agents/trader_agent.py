@@ -1,17 +1,48 @@
-import asyncio
 import random
-from datetime import datetime
 from typing import Optional, Dict
 import logging
 
 from .base_agent import BaseAgent
 from core.schemas import Order, OrderSide, OrderStatus, SignalType
-from core.message_bus import MessageBus
+from core.message_bus import MessageBus, symbol_channel
+from core.timeutils import utcnow
 
 logger = logging.getLogger(__name__)
 
+_BUY = OrderSide.BUY.to_str()
+_SELL = OrderSide.SELL.to_str()
+
+_SIDE_VALUES = {OrderSide.BUY: _BUY, OrderSide.SELL: _SELL}
+_PRICE_OFFSETS = {OrderSide.BUY: 1.01, OrderSide.SELL: 0.99}
+
+
+def _order_request_message(order: Order, side_value: str) -> dict:
+    return {
+        "type": "order_request",
+        "order_id": order.id,
+        "timestamp": order.timestamp.isoformat(),
+        "trader_id": order.trader_id,
+        "symbol": order.symbol,
+        "side": side_value,
+        "quantity": order.quantity,
+        "price": order.price,
+        "signal_id": order.signal_id
+    }
+
 
 class TraderAgent(BaseAgent):
+    __slots__ = (
+        "symbols",
+        "cash",
+        "max_position_value",
+        "positions",
+        "current_prices",
+        "pending_orders",
+        "order_count",
+        "portfolio_value",
+        "_value_delta"
+    )
+    
     def __init__(
         self,
         agent_id: str,
@@ -22,54 +53,92 @@ class TraderAgent(BaseAgent):
         log_level: str = "INFO"
     ):
         super().__init__(agent_id, message_bus, log_level)
-        self.symbols = symbols
+        self.symbols = frozenset(symbols)
         self.cash = initial_cash
         self.max_position_value = max_position_value
         
         self.positions: Dict[str, int] = {symbol: 0 for symbol in symbols}
         self.current_prices: Dict[str, float] = {}
         
-        self.pending_orders: list[Order] = []
+        self.pending_orders: Dict[str, Order] = {}
         self.order_count = 0
+        
+        self.portfolio_value = initial_cash
+        self._value_delta = 0.0
     
     async def _setup_subscriptions(self) -> None:
-        await self.subscribe("signals", self._on_signal)
-        await self.subscribe("market_data", self._on_market_update)
-        await self.subscribe("risk_decisions", self._on_risk_decision)
-        await self.subscribe("trades", self._on_trade_executed)
+        for symbol in self.symbols:
+            await self.subscribe(
+                symbol_channel("signals", symbol), self._on_signal, message_type="signal"
+            )
+            await self.subscribe(
+                symbol_channel("market_data", symbol),
+                self._on_market_update,
+                message_type="market_update"
+            )
+        await self.subscribe(
+            "signals_batch", self._on_signals_batch, message_type="signals_batch"
+        )
+        await self.subscribe(
+            "risk_decisions", self._on_risk_decision, message_type="risk_decision"
+        )
+        await self.subscribe(
+            "trades", self._on_trade_executed, message_type="trade_executed"
+        )
     
     async def _run(self) -> None:
-        while self._running:
-            await asyncio.sleep(1)
+        await self._stop_event.wait()
     
     async def _on_market_update(self, message: dict) -> None:
-        if message.get("type") != "market_update":
-            return
-        
         symbol = message.get("symbol")
         close_price = message.get("close")
         
         if symbol and close_price:
+            position = self.positions.get(symbol, 0)
+            if position:
+                delta = (close_price - self.current_prices.get(symbol, 0)) * position
+                self.portfolio_value += delta
+                self._value_delta += delta
             self.current_prices[symbol] = close_price
     
+    async def _on_market_tick(self, message: dict) -> None:
+        try:
+            delta, self._value_delta = self._value_delta, 0.0
+            await self._publish_value_change(delta)
+        finally:
+            await super()._on_market_tick(message)
+    
+    async def _publish_value_change(self, delta: float) -> None:
+        if delta:
+            await self.publish(
+                "portfolio_value",
+                {
+                    "type": "portfolio_value_change",
+                    "trader_id": self.agent_id,
+                    "delta": delta,
+                    "portfolio_value": self.portfolio_value
+                }
+            )
+    
+    async def _on_signals_batch(self, message: dict) -> None:
+        symbols = self.symbols
+        for item in message.get("items", []):
+            if item.get("symbol") in symbols:
+                await self._on_signal(item)
+    
     async def _on_signal(self, message: dict) -> None:
-        if message.get("type") != "signal":
-            return
-        
         symbol = message.get("symbol")
-        if symbol not in self.symbols:
-            return
-        
         signal_type = message.get("signal_type")
         confidence = message.get("confidence", 0.0)
         signal_id = message.get("signal_id")
         
         if confidence < 0.6:
-            self.logger.debug(f"Ignoring low confidence signal", confidence=confidence)
+            if self.logger.is_enabled_for(logging.DEBUG):
+                self.logger.debug("Ignoring low confidence signal", confidence=confidence)
             return
         
         if symbol not in self.current_prices:
-            self.logger.warning(f"No price data for {symbol}, cannot trade")
+            self.logger.warning("No price data for %s, cannot trade", symbol)
             return
         
         current_price = self.current_prices[symbol]
@@ -93,50 +162,15 @@ class TraderAgent(BaseAgent):
         available_capital = min(self.cash * 0.1, self.max_position_value * 0.3)
         
         if available_capital < current_price:
-            self.logger.debug(f"Insufficient cash for {symbol}")
+            if self.logger.is_enabled_for(logging.DEBUG):
+                self.logger.debug("Insufficient cash", symbol=symbol)
             return
         
         quantity = int(available_capital / current_price)
         if quantity < 1:
             return
         
-        self.order_count += 1
-        order = Order(
-            id=f"{self.agent_id}_order_{self.order_count}",
-            timestamp=datetime.utcnow(),
-            trader_id=self.agent_id,
-            symbol=symbol,
-            side=OrderSide.BUY,
-            quantity=quantity,
-            price=current_price * 1.01,
-            status=OrderStatus.PENDING,
-            signal_id=signal_id
-        )
-        
-        self.pending_orders.append(order)
-        
-        await self.publish(
-            "orders",
-            {
-                "type": "order_request",
-                "order_id": order.id,
-                "timestamp": order.timestamp.isoformat(),
-                "trader_id": order.trader_id,
-                "symbol": order.symbol,
-                "side": order.side.value,
-                "quantity": order.quantity,
-                "price": order.price,
-                "signal_id": signal_id
-            }
-        )
-        
-        self.logger.info(
-            f"Placed BUY order",
-            order_id=order.id,
-            symbol=symbol,
-            quantity=quantity,
-            price=f"{current_price:.2f}"
-        )
+        await self._place_order(OrderSide.BUY, symbol, current_price, quantity, signal_id)
     
     async def _place_sell_order(
         self, 
@@ -150,38 +184,37 @@ class TraderAgent(BaseAgent):
         
         quantity = max(1, int(current_position * 0.5))
         
+        await self._place_order(OrderSide.SELL, symbol, current_price, quantity, signal_id)
+    
+    async def _place_order(
+        self,
+        side: OrderSide,
+        symbol: str,
+        current_price: float,
+        quantity: int,
+        signal_id: Optional[str] = None
+    ) -> None:
+        side_value = _SIDE_VALUES[side]
+        
         self.order_count += 1
-        order = Order(
+        order = Order.build(
             id=f"{self.agent_id}_order_{self.order_count}",
-            timestamp=datetime.utcnow(),
+            timestamp=utcnow(),
             trader_id=self.agent_id,
             symbol=symbol,
-            side=OrderSide.SELL,
+            side=side,
             quantity=quantity,
-            price=current_price * 0.99,
+            price=current_price * _PRICE_OFFSETS[side],
             status=OrderStatus.PENDING,
             signal_id=signal_id
         )
         
-        self.pending_orders.append(order)
+        self.pending_orders[order.id] = order
         
-        await self.publish(
-            "orders",
-            {
-                "type": "order_request",
-                "order_id": order.id,
-                "timestamp": order.timestamp.isoformat(),
-                "trader_id": order.trader_id,
-                "symbol": order.symbol,
-                "side": order.side.value,
-                "quantity": order.quantity,
-                "price": order.price,
-                "signal_id": signal_id
-            }
-        )
+        await self.publish("orders", _order_request_message(order, side_value))
         
         self.logger.info(
-            f"Placed SELL order",
+            f"Placed {side_value} order",
             order_id=order.id,
             symbol=symbol,
             quantity=quantity,
@@ -189,16 +222,10 @@ class TraderAgent(BaseAgent):
         )
     
     async def _on_risk_decision(self, message: dict) -> None:
-        if message.get("type") != "risk_decision":
-            return
-        
         order_id = message.get("order_id")
         approved = message.get("approved", False)
         
-        matching_order = next(
-            (o for o in self.pending_orders if o.id == order_id),
-            None
-        )
+        matching_order = self.pending_orders.get(order_id)
         
         if not matching_order:
             return
@@ -213,10 +240,10 @@ class TraderAgent(BaseAgent):
                     "order_id": matching_order.id,
                     "trader_id": matching_order.trader_id,
                     "symbol": matching_order.symbol,
-                    "side": matching_order.side.value,
+                    "side": _SIDE_VALUES[matching_order.side],
                     "quantity": matching_order.quantity,
                     "price": matching_order.price,
-                    "timestamp": datetime.utcnow().isoformat()
+                    "timestamp": utcnow()
                 }
             )
             
@@ -224,7 +251,7 @@ class TraderAgent(BaseAgent):
         else:
             matching_order.status = OrderStatus.REJECTED
             matching_order.rejection_reason = message.get("reason", "Unknown")
-            self.pending_orders.remove(matching_order)
+            del self.pending_orders[order_id]
             
             self.logger.warning(
                 f"Order rejected",
@@ -233,15 +260,9 @@ class TraderAgent(BaseAgent):
             )
     
     async def _on_trade_executed(self, message: dict) -> None:
-        if message.get("type") != "trade_executed":
-            return
-        
         order_id = message.get("order_id")
         
-        matching_order = next(
-            (o for o in self.pending_orders if o.id == order_id),
-            None
-        )
+        matching_order = self.pending_orders.pop(order_id, None)
         
         if not matching_order:
             return
@@ -252,14 +273,20 @@ class TraderAgent(BaseAgent):
         execution_price = message.get("execution_price")
         commission = message.get("commission", 0.0)
         
-        if side == "BUY":
+        mark_price = self.current_prices.get(symbol, 0)
+        if side == _BUY:
             self.positions[symbol] = self.positions.get(symbol, 0) + quantity
             self.cash -= (execution_price * quantity + commission)
-        elif side == "SELL":
+            delta = (mark_price - execution_price) * quantity - commission
+        elif side == _SELL:
             self.positions[symbol] = self.positions.get(symbol, 0) - quantity
             self.cash += (execution_price * quantity - commission)
+            delta = (execution_price - mark_price) * quantity - commission
+        else:
+            delta = 0.0
         
-        self.pending_orders.remove(matching_order)
+        self.portfolio_value += delta
+        await self._publish_value_change(delta)
         
         self.logger.info(
             f"Trade executed",
@@ -3,13 +3,15 @@ from .schemas import (
     News, Signal, Order, Trade, Position, 
     PortfolioState, MarketData
 )
-from .message_bus import MessageBus, LocalMessageBus, RedisMessageBus
+from .message_bus import MessageBus, LocalMessageBus, RedisMessageBus, symbol_channel
 from .logger import StructuredLogger, setup_logging
+from .timeutils import utcnow, utcnow_iso
 
 __all__ = [
     "OrderSide", "OrderStatus", "SignalType",
     "News", "Signal", "Order", "Trade", "Position",
     "PortfolioState", "MarketData",
-    "MessageBus", "LocalMessageBus", "RedisMessageBus",
-    "StructuredLogger", "setup_logging"
+    "MessageBus", "LocalMessageBus", "RedisMessageBus", "symbol_channel",
+    "StructuredLogger", "setup_logging",
+    "utcnow", "utcnow_iso"
 ]
\ No newline at end of file
@@ -1,9 +1,28 @@
+import atexit
 import logging
+import logging.handlers
+import queue
 import sys
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
+_listeners: list[logging.handlers.QueueListener] = []
+
+
+def _queued(handler: logging.Handler) -> logging.Handler:
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=True)
+    listener.start()
+    _listeners.append(listener)
+    return logging.handlers.QueueHandler(log_queue)
+
+
+@atexit.register
+def _stop_listeners() -> None:
+    while _listeners:
+        _listeners.pop().stop()
+
 
 class StructuredLogger:
     def __init__(
@@ -32,28 +51,35 @@ class StructuredLogger:
                 file_handler = logging.FileHandler(log_file)
                 file_handler.setLevel(logging.DEBUG)
                 file_handler.setFormatter(formatter)
-                self.logger.addHandler(file_handler)
+                self.logger.addHandler(_queued(file_handler))
+    
+    def is_enabled_for(self, level: int) -> bool:
+        return self.logger.isEnabledFor(level)
     
-    def debug(self, message: str, **kwargs) -> None:
-        self._log(logging.DEBUG, message, **kwargs)
+    def debug(self, message: str, *args, **kwargs) -> None:
+        self._log(logging.DEBUG, message, *args, **kwargs)
     
-    def info(self, message: str, **kwargs) -> None:
-        self._log(logging.INFO, message, **kwargs)
+    def info(self, message: str, *args, **kwargs) -> None:
+        self._log(logging.INFO, message, *args, **kwargs)
     
-    def warning(self, message: str, **kwargs) -> None:
-        self._log(logging.WARNING, message, **kwargs)
+    def warning(self, message: str, *args, **kwargs) -> None:
+        self._log(logging.WARNING, message, *args, **kwargs)
     
-    def error(self, message: str, **kwargs) -> None:
-        self._log(logging.ERROR, message, **kwargs)
+    def error(self, message: str, *args, **kwargs) -> None:
+        self._log(logging.ERROR, message, *args, **kwargs)
     
-    def critical(self, message: str, **kwargs) -> None:
-        self._log(logging.CRITICAL, message, **kwargs)
+    def critical(self, message: str, *args, **kwargs) -> None:
+        self._log(logging.CRITICAL, message, *args, **kwargs)
     
-    def _log(self, level: int, message: str, **kwargs) -> None:
+    def _log(self, level: int, message: str, *args, **kwargs) -> None:
+        if not self.logger.isEnabledFor(level):
+            return
+        
         if kwargs:
             extra_info = " | ".join(f"{k}={v}" for k, v in kwargs.items())
-            message = f"{message} | {extra_info}"
-        self.logger.log(level, message)
+            self.logger.log(level, "%s | %s", message % args if args else message, extra_info)
+        else:
+            self.logger.log(level, message, *args)
 
 
 def setup_logging(log_level: str = "INFO", log_dir: Optional[str] = None) -> None:
@@ -1,16 +1,23 @@
 from datetime import datetime, timedelta
 from typing import Optional, Dict
 import pandas as pd
-from collections import defaultdict
+import numpy as np
 import asyncio
 import logging
+import sys
 
-from .schemas import Order, Trade, OrderStatus, OrderSide, MarketData
-from .message_bus import MessageBus
+from .schemas import Order, Trade, OrderStatus, OrderSide
+from .message_bus import MessageBus, symbol_channel
 
 logger = logging.getLogger(__name__)
 
 
+def _trading_days(timestamps: pd.Series) -> np.ndarray:
+    if timestamps.dt.tz is not None:
+        timestamps = timestamps.dt.tz_localize(None)
+    return timestamps.to_numpy(dtype='datetime64[D]')
+
+
 class MarketEnvironment:
     def __init__(
         self,
@@ -23,6 +30,7 @@ class MarketEnvironment:
         self.commission_rate = commission_rate
         
         self.current_time: Optional[datetime] = None
+        self.current_time_iso: Optional[str] = None
         self.current_prices: Dict[str, float] = {}
         
         self.pending_orders: list[Order] = []
@@ -31,86 +39,137 @@ class MarketEnvironment:
         self._prepare_market_data()
     
     def _prepare_market_data(self) -> None:
-        self.timeline = []
-        
-        all_dates = set()
-        for symbol, df in self.historical_data.items():
-            all_dates.update(df['timestamp'].dt.date.unique())
+        self._symbols = [sys.intern(symbol) for symbol in self.historical_data]
+        self._sym_idx = {symbol: i for i, symbol in enumerate(self._symbols)}
+        self._market_channels = [symbol_channel("market_data", symbol) for symbol in self._symbols]
         
-        self.timeline = sorted(list(all_dates))
+        day_keys = {
+            symbol: _trading_days(df['timestamp'])
+            for symbol, df in self.historical_data.items()
+        }
+        if day_keys:
+            self._dates = np.unique(np.concatenate(list(day_keys.values())))
+        else:
+            self._dates = np.array([], dtype='datetime64[D]')
         
-        self.data_by_date: Dict[datetime.date, Dict[str, MarketData]] = defaultdict(dict)
+        shape = (len(self._dates), len(self._symbols))
+        self._open = np.full(shape, np.nan)
+        self._high = np.full(shape, np.nan)
+        self._low = np.full(shape, np.nan)
+        self._close = np.full(shape, np.nan)
+        self._volume = np.zeros(shape, dtype=np.int64)
+        self._timestamps = np.empty(shape, dtype=object)
+        self._present = np.zeros(shape, dtype=bool)
         
         for symbol, df in self.historical_data.items():
-            df['date'] = df['timestamp'].dt.date
-            for _, row in df.iterrows():
-                market_data = MarketData(
-                    timestamp=row['timestamp'],
-                    symbol=symbol,
-                    open=row['Open'],
-                    high=row['High'],
-                    low=row['Low'],
-                    close=row['Close'],
-                    volume=int(row['Volume'])
-                )
-                self.data_by_date[row['date']][symbol] = market_data
+            col = self._sym_idx[symbol]
+            rows = np.searchsorted(self._dates, day_keys[symbol])
+            
+            self._open[rows, col] = df['Open'].to_numpy(dtype=np.float64)
+            self._high[rows, col] = df['High'].to_numpy(dtype=np.float64)
+            self._low[rows, col] = df['Low'].to_numpy(dtype=np.float64)
+            self._close[rows, col] = df['Close'].to_numpy(dtype=np.float64)
+            self._volume[rows, col] = df['Volume'].to_numpy(dtype=np.int64)
+            self._timestamps[rows, col] = [ts.isoformat() for ts in df['timestamp'].tolist()]
+            self._present[rows, col] = True
+        
+        self.timeline = self._dates.tolist()
         
         logger.info(f"Market prepared: {len(self.timeline)} trading days, {len(self.historical_data)} symbols")
     
+    def _day_index(self, target_date: datetime.date) -> Optional[int]:
+        day = int(np.searchsorted(self._dates, np.datetime64(target_date, 'D')))
+        if day < len(self._dates) and self._dates[day] == np.datetime64(target_date, 'D'):
+            return day
+        return None
+    
     async def advance_time(self, target_date: datetime.date) -> None:
-        if target_date not in self.data_by_date:
-            logger.warning(f"No market data for {target_date}")
+        day = self._day_index(target_date)
+        if day is None:
+            logger.warning("No market data for %s", target_date)
             return
         
         self.current_time = datetime.combine(target_date, datetime.min.time())
+        self.current_time_iso = self.current_time.isoformat()
         
-        day_data = self.data_by_date[target_date]
-        for symbol, market_data in day_data.items():
-            self.current_prices[symbol] = market_data.close
-            
-            await self.message_bus.publish(
-                "market_data",
-                {
-                    "type": "market_update",
-                    "timestamp": market_data.timestamp.isoformat(),
-                    "symbol": symbol,
-                    "open": market_data.open,
-                    "high": market_data.high,
-                    "low": market_data.low,
-                    "close": market_data.close,
-                    "volume": market_data.volume
-                }
+        cols = np.flatnonzero(self._present[day]).tolist()
+        symbols = [self._symbols[col] for col in cols]
+        closes = self._close[day, cols].tolist()
+        self.current_prices.update(zip(symbols, closes))
+        
+        payloads = [
+            {
+                "type": "market_update",
+                "timestamp": timestamp,
+                "symbol": symbol,
+                "open": open_,
+                "high": high,
+                "low": low,
+                "close": close,
+                "volume": volume
+            }
+            for symbol, timestamp, open_, high, low, close, volume in zip(
+                symbols,
+                self._timestamps[day, cols].tolist(),
+                self._open[day, cols].tolist(),
+                self._high[day, cols].tolist(),
+                self._low[day, cols].tolist(),
+                closes,
+                self._volume[day, cols].tolist()
             )
+        ]
+        for col, payload in zip(cols, payloads):
+            await self.message_bus.publish(self._market_channels[col], payload)
+        await self.message_bus.publish(
+            "market_tick", {"type": "market_tick", "timestamp": self.current_time_iso}
+        )
         
-        logger.info(f"Market advanced to {target_date}, {len(day_data)} symbols updated")
+        logger.info("Market advanced to %s, %d symbols updated", target_date, len(symbols))
     
-    async def submit_order(self, order: Order) -> None:
-        if order.status != OrderStatus.APPROVED:
-            logger.warning(f"Rejecting non-approved order {order.id}")
-            return
+    async def submit_orders_bulk(self, orders: list[Order]) -> None:
+        approved = [order for order in orders if order.status is OrderStatus.APPROVED]
+        if len(approved) != len(orders):
+            logger.warning("Rejecting %d non-approved orders", len(orders) - len(approved))
         
-        self.pending_orders.append(order)
-        logger.debug(f"Order {order.id} queued for execution")
+        self.pending_orders.extend(approved)
+        logger.debug("%d orders queued for execution", len(approved))
+    
+    async def step(self, orders: list[Order]) -> None:
+        await self.submit_orders_bulk(orders)
+        await self.execute_pending_orders()
     
     async def execute_pending_orders(self) -> None:
-        executed_count = 0
+        messages = self._execute_pending()
+        if messages:
+            await self.message_bus.publish_many("trades", messages)
+            logger.info("Executed %d orders", len(messages))
+    
+    def _execute_pending(self) -> list[dict]:
+        messages: list[dict] = []
         
-        for order in self.pending_orders[:]:
+        orders = self.pending_orders
+        self.pending_orders = []
+        remaining: list[Order] = []
+        
+        for order in orders:
             if order.symbol not in self.current_prices:
-                logger.warning(f"No price data for {order.symbol}, skipping order {order.id}")
+                logger.warning("No price data for %s, skipping order %s", order.symbol, order.id)
+                remaining.append(order)
                 continue
             
             execution_price = self.current_prices[order.symbol]
             
             if order.price is not None:
-                if order.side == OrderSide.BUY and execution_price > order.price:
+                if order.side is OrderSide.BUY and execution_price > order.price:
+                    remaining.append(order)
                     continue
-                if order.side == OrderSide.SELL and execution_price < order.price:
+                if order.side is OrderSide.SELL and execution_price < order.price:
+                    remaining.append(order)
                     continue
             
             commission = execution_price * order.quantity * self.commission_rate
             
-            trade = Trade(
+            trade = Trade.build(
                 id=f"trade_{order.id}",
                 timestamp=self.current_time,
                 order_id=order.id,
@@ -123,32 +182,28 @@ class MarketEnvironment:
             )
             
             self.executed_trades.append(trade)
-            self.pending_orders.remove(order)
             
-            await self.message_bus.publish(
-                "trades",
-                {
-                    "type": "trade_executed",
-                    "trade_id": trade.id,
-                    "order_id": trade.order_id,
-                    "symbol": trade.symbol,
-                    "side": trade.side.value,
-                    "quantity": trade.quantity,
-                    "execution_price": trade.execution_price,
-                    "commission": trade.commission,
-                    "timestamp": trade.timestamp.isoformat(),
-                    "trader_id": trade.trader_id
-                }
-            )
+            messages.append({
+                "type": "trade_executed",
+                "trade_id": trade.id,
+                "order_id": trade.order_id,
+                "symbol": trade.symbol,
+                "side": trade.side.to_str(),
+                "quantity": trade.quantity,
+                "execution_price": trade.execution_price,
+                "commission": trade.commission,
+                "timestamp": self.current_time_iso,
+                "trader_id": trade.trader_id
+            })
             
-            executed_count += 1
-            logger.info(f"Executed trade {trade.id}: {trade.side.value} {trade.quantity} {trade.symbol} @ {trade.execution_price:.2f}")
+            logger.info(
+                "Executed trade %s: %s %d %s @ %.2f",
+                trade.id, trade.side.to_str(), trade.quantity, trade.symbol, trade.execution_price
+            )
         
-        if executed_count > 0:
-            logger.info(f"Executed {executed_count} orders")
+        remaining.extend(self.pending_orders)
+        self.pending_orders = remaining
+        return messages
     
     def get_current_price(self, symbol: str) -> Optional[float]:
         return self.current_prices.get(symbol)
-    
-    def get_all_current_prices(self) -> Dict[str, float]:
-        return self.current_prices.copy()
\ No newline at end of file
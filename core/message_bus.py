@@ -1,23 +1,49 @@
 from abc import ABC, abstractmethod
-from typing import Any, Optional, Callable, Awaitable
+from typing import Any, Optional, Callable, Awaitable, Sequence
 import asyncio
-import json
-from datetime import datetime
+import contextlib
+from datetime import date
 import logging
 
+import orjson
+
 logger = logging.getLogger(__name__)
 
+def _default(obj: Any) -> str:
+    if isinstance(obj, date):
+        return obj.isoformat()
+    return str(obj)
+
+
+def _orjson_encode(message: dict[str, Any]) -> bytes:
+    return orjson.dumps(message, default=_default)
+
 
 class MessageBus(ABC):
     @abstractmethod
     async def publish(self, channel: str, message: dict[str, Any]) -> None:
         pass
     
+    async def publish_many(self, channel: str, messages: list[dict[str, Any]]) -> None:
+        for message in messages:
+            await self.publish(channel, message)
+    
+    def begin_batch(self) -> None:
+        pass
+    
+    async def flush_batch(self) -> None:
+        pass
+    
+    async def drain(self) -> None:
+        pass
+    
     @abstractmethod
     async def subscribe(
         self, 
         channel: str, 
-        callback: Callable[[dict[str, Any]], Awaitable[None]]
+        callback: Callable[[dict[str, Any]], Awaitable[None]],
+        message_type: Optional[str] = None,
+        inline: bool = False
     ) -> None:
         pass
     
@@ -26,85 +52,141 @@ class MessageBus(ABC):
         pass
 
 
+def symbol_channel(channel: str, symbol: str) -> str:
+    return f"{channel}:{symbol}"
+
+
+def _subscription_keys(
+    channel: str, 
+    message: dict[str, Any]
+) -> tuple[tuple[str, Optional[str]], ...]:
+    message_type = message.get("type")
+    if message_type is None:
+        return ((channel, None),)
+    return ((channel, None), (channel, message_type))
+
+
 class LocalMessageBus(MessageBus):
-    def __init__(self):
-        self.channels: dict[str, list[Callable]] = {}
-        self.queue: asyncio.Queue = asyncio.Queue()
+    def __init__(self, inline_dispatch: bool = True):
+        self.channels: dict[tuple[str, Optional[str]], tuple[tuple[Callable, bool], ...]] = {}
+        self.inline_dispatch = inline_dispatch
+        self.queue: asyncio.Queue[Optional[tuple[str, Sequence[dict[str, Any]]]]] = asyncio.Queue()
         self._running = False
         self._task: Optional[asyncio.Task] = None
     
     async def start(self) -> None:
         if not self._running:
             self._running = True
-            self._task = asyncio.create_task(self._process_messages())
-            logger.info("LocalMessageBus started")
+            if not self.inline_dispatch:
+                self._task = asyncio.create_task(self._process_messages())
+            logger.info(f"LocalMessageBus started (inline_dispatch={self.inline_dispatch})")
     
     async def publish(self, channel: str, message: dict[str, Any]) -> None:
         if not isinstance(message, dict):
             raise ValueError("Message must be a dictionary")
         
-        message_with_meta = {
-            "channel": channel,
-            "data": message,
-            "timestamp": datetime.utcnow().isoformat()
-        }
-        await self.queue.put(message_with_meta)
-        logger.debug(f"Published to {channel}: {message.get('type', 'unknown')}")
+        if self.inline_dispatch:
+            await self._dispatch(channel, (message,))
+            return
+        
+        await self.queue.put((channel, (message,)))
+        logger.debug("Published to %s: %s", channel, message.get('type', 'unknown'))
+    
+    async def publish_many(self, channel: str, messages: list[dict[str, Any]]) -> None:
+        if not messages:
+            return
+        
+        if self.inline_dispatch:
+            await self._dispatch(channel, messages)
+            return
+        
+        await self.queue.put((channel, messages))
+        logger.debug("Published batch of %d to %s", len(messages), channel)
     
     async def subscribe(
         self, 
         channel: str, 
-        callback: Callable[[dict[str, Any]], Awaitable[None]]
+        callback: Callable[[dict[str, Any]], Awaitable[None]],
+        message_type: Optional[str] = None,
+        inline: bool = False
     ) -> None:
-        if channel not in self.channels:
-            self.channels[channel] = []
-        self.channels[channel].append(callback)
-        logger.info(f"Subscribed to channel: {channel}")
+        key = (channel, message_type)
+        self.channels[key] = self.channels.get(key, ()) + ((callback, inline),)
+        logger.info(f"Subscribed to channel: {channel} (type={message_type or '*'})")
     
     async def _process_messages(self) -> None:
-        while self._running:
+        while True:
+            item = await self.queue.get()
+            if item is None:
+                self.queue.task_done()
+                break
+            
             try:
-                message = await asyncio.wait_for(
-                    self.queue.get(), 
-                    timeout=0.1
-                )
-                channel = message["channel"]
-                data = message["data"]
-                
-                if channel in self.channels:
-                    tasks = [
-                        callback(data) 
-                        for callback in self.channels[channel]
-                    ]
-                    await asyncio.gather(*tasks, return_exceptions=True)
-                
-            except asyncio.TimeoutError:
-                continue
+                channel, batch = item
+                await self._dispatch(channel, batch)
             except Exception as e:
                 logger.error(f"Error processing message: {e}", exc_info=True)
+            finally:
+                self.queue.task_done()
+    
+    async def drain(self) -> None:
+        if self._task is not None and not self._task.done():
+            await self.queue.join()
+    
+    async def _dispatch(self, channel: str, batch: Sequence[dict[str, Any]]) -> None:
+        for data in batch:
+            tasks = []
+            for key in _subscription_keys(channel, data):
+                for callback, inline in self.channels.get(key, ()):
+                    if not inline:
+                        tasks.append(callback(data))
+                        continue
+                    try:
+                        await callback(data)
+                    except Exception as e:
+                        logger.error("Error in subscriber callback: %s", e)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
     
     async def close(self) -> None:
         self._running = False
         if self._task:
+            await self.queue.put(None)
             await self._task
         logger.info("LocalMessageBus closed")
 
 
 class RedisMessageBus(MessageBus):
-    def __init__(self, redis_url: str = "redis://localhost:6379"):
+    def __init__(
+        self,
+        redis_url: str = "redis://localhost:6379",
+        use_msgpack: bool = False,
+        use_lists: bool = False,
+        list_key: str = "trading_swarm:bus"
+    ):
         self.redis_url = redis_url
+        self.use_msgpack = use_msgpack
+        self.use_lists = use_lists
+        self.list_key = list_key
         self.redis_client: Optional[Any] = None
         self.pubsub: Optional[Any] = None
-        self.subscribers: dict[str, list[Callable]] = {}
-        self._tasks: list[asyncio.Task] = []
+        self.subscribers: dict[tuple[str, Optional[str]], tuple[tuple[Callable, bool], ...]] = {}
+        self.channels: set[str] = set()
+        self._channel_names: dict[bytes, str] = {}
+        self._listener_task: Optional[asyncio.Task] = None
+        self._pending: Optional[list[tuple[str, bytes]]] = None
+        
+        self._encode: Callable[[dict[str, Any]], bytes] = _orjson_encode
+        self._decode: Callable[[bytes], Any] = orjson.loads
+        if use_msgpack:
+            import msgspec
+            self._encode = msgspec.msgpack.Encoder(enc_hook=_default).encode
+            self._decode = msgspec.msgpack.Decoder().decode
     
     async def connect(self) -> None:
         try:
             import redis.asyncio as aioredis
-            self.redis_client = aioredis.from_url(
-                self.redis_url,
-                decode_responses=True
-            )
+            self.redis_client = aioredis.from_url(self.redis_url)
             await self.redis_client.ping()
             self.pubsub = self.redis_client.pubsub()
             logger.info(f"Connected to Redis: {self.redis_url}")
@@ -116,37 +198,122 @@ class RedisMessageBus(MessageBus):
         if not self.redis_client:
             raise RuntimeError("Redis client not connected")
         
-        message_json = json.dumps(message, default=str)
-        await self.redis_client.publish(channel, message_json)
-        logger.debug(f"Published to Redis {channel}")
+        await self.publish_encoded(channel, self._encode(message))
+    
+    async def publish_encoded(self, channel: str, payload: bytes) -> None:
+        if not self.redis_client:
+            raise RuntimeError("Redis client not connected")
+        
+        if self._pending is not None:
+            self._pending.append((channel, payload))
+            return
+        
+        await self._send(self.redis_client, channel, payload)
+        logger.debug("Published to Redis %s", channel)
+    
+    async def publish_many(self, channel: str, messages: list[dict[str, Any]]) -> None:
+        if not messages:
+            return
+        
+        if not self.redis_client:
+            raise RuntimeError("Redis client not connected")
+        
+        if self._pending is not None:
+            self._pending.extend((channel, self._encode(message)) for message in messages)
+            return
+        
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            for message in messages:
+                self._send(pipe, channel, self._encode(message))
+            await pipe.execute()
+        logger.debug("Published batch of %d to Redis %s", len(messages), channel)
+    
+    def _send(self, target: Any, channel: str, payload: bytes) -> Any:
+        if self.use_lists:
+            return target.lpush(self.list_key, channel.encode() + b"\0" + payload)
+        return target.publish(channel, payload)
+    
+    def begin_batch(self) -> None:
+        if self._pending is None:
+            self._pending = []
+    
+    async def flush_batch(self) -> None:
+        pending = self._pending
+        self._pending = None
+        if not pending:
+            return
+        
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            for channel, payload in pending:
+                self._send(pipe, channel, payload)
+            await pipe.execute()
+        logger.debug("Flushed batch of %d Redis publishes", len(pending))
     
     async def subscribe(
         self, 
         channel: str, 
-        callback: Callable[[dict[str, Any]], Awaitable[None]]
+        callback: Callable[[dict[str, Any]], Awaitable[None]],
+        message_type: Optional[str] = None,
+        inline: bool = False
     ) -> None:
-        if channel not in self.subscribers:
-            self.subscribers[channel] = []
-            await self.pubsub.subscribe(channel)
-            task = asyncio.create_task(self._listen(channel))
-            self._tasks.append(task)
+        if channel not in self.channels:
+            self.channels.add(channel)
+            encoded = channel.encode()
+            self._channel_names[encoded] = channel
+            if not self.use_lists:
+                await self.pubsub.subscribe(encoded)
+            if self._listener_task is None:
+                listen = self._consume if self.use_lists else self._listen
+                self._listener_task = asyncio.create_task(listen())
         
-        self.subscribers[channel].append(callback)
-        logger.info(f"Subscribed to Redis channel: {channel}")
+        key = (channel, message_type)
+        self.subscribers[key] = self.subscribers.get(key, ()) + ((callback, inline),)
+        logger.info(f"Subscribed to Redis channel: {channel} (type={message_type or '*'})")
     
-    async def _listen(self, channel: str) -> None:
+    async def _listen(self) -> None:
         async for message in self.pubsub.listen():
             if message["type"] == "message":
+                await self._deliver(message["channel"], message["data"])
+    
+    async def _consume(self) -> None:
+        while True:
+            item = await self.redis_client.brpop(self.list_key, timeout=1)
+            if item is None:
+                continue
+            
+            channel, _, payload = item[1].partition(b"\0")
+            if channel in self._channel_names:
+                await self._deliver(channel, payload)
+    
+    async def _deliver(self, raw_channel: bytes, payload: bytes) -> None:
+        try:
+            data = self._decode(payload)
+            channel = self._channel_names[raw_channel]
+        except Exception as e:
+            logger.error("Failed to decode Redis message on %r: %s", raw_channel, e)
+            return
+        
+        tasks = []
+        for key in _subscription_keys(channel, data):
+            for callback, inline in self.subscribers.get(key, ()):
+                if not inline:
+                    tasks.append(callback(data))
+                    continue
                 try:
-                    data = json.loads(message["data"])
-                    for callback in self.subscribers.get(channel, []):
-                        await callback(data)
+                    await callback(data)
                 except Exception as e:
-                    logger.error(f"Error in subscriber callback: {e}")
+                    logger.error("Error in subscriber callback: %s", e)
+        
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error("Error in subscriber callback: %s", result)
     
     async def close(self) -> None:
-        for task in self._tasks:
-            task.cancel()
+        if self._listener_task:
+            self._listener_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._listener_task
         
         if self.pubsub:
             await self.pubsub.close()
@@ -27,9 +27,9 @@ class Portfolio:
     
     def execute_trade(self, trade: Trade) -> bool:
         try:
-            if trade.side == OrderSide.BUY:
+            if trade.side is OrderSide.BUY:
                 return self._execute_buy(trade)
-            elif trade.side == OrderSide.SELL:
+            elif trade.side is OrderSide.SELL:
                 return self._execute_sell(trade)
             return False
         except Exception as e:
@@ -53,7 +53,7 @@ class Portfolio:
             position.current_price = trade.execution_price
             position.unrealized_pnl = (position.current_price - position.avg_cost) * position.quantity
         else:
-            self.positions[trade.symbol] = Position(
+            self.positions[trade.symbol] = Position.build(
                 symbol=trade.symbol,
                 quantity=trade.quantity,
                 avg_cost=trade.execution_price,
@@ -118,20 +118,28 @@ class Portfolio:
     def get_unrealized_pnl(self) -> float:
         return sum(pos.unrealized_pnl for pos in self.positions.values())
     
-    def get_total_pnl(self) -> float:
-        return self.realized_pnl + self.get_unrealized_pnl()
+    def get_total_pnl(self, unrealized_pnl: Optional[float] = None) -> float:
+        if unrealized_pnl is None:
+            unrealized_pnl = self.get_unrealized_pnl()
+        return self.realized_pnl + unrealized_pnl
     
     def get_summary(self) -> dict:
-        total_value = self.get_total_value()
+        positions_value = 0.0
+        unrealized_pnl = 0.0
+        for pos in self.positions.values():
+            positions_value += pos.quantity * pos.current_price
+            unrealized_pnl += pos.unrealized_pnl
+        
+        total_value = self.cash + positions_value
         
         return {
             "cash": self.cash,
             "positions_count": len(self.positions),
-            "positions_value": sum(p.quantity * p.current_price for p in self.positions.values()),
+            "positions_value": positions_value,
             "total_value": total_value,
             "realized_pnl": self.realized_pnl,
-            "unrealized_pnl": self.get_unrealized_pnl(),
-            "total_pnl": self.get_total_pnl(),
+            "unrealized_pnl": unrealized_pnl,
+            "total_pnl": self.get_total_pnl(unrealized_pnl),
             "total_return_pct": ((total_value - self.initial_cash) / self.initial_cash) * 100,
             "trades_count": len(self.trades_history)
         }
\ No newline at end of file
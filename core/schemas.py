@@ -1,93 +1,164 @@
+import sys
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional, Literal
+from typing import Any, Optional, Literal
 from enum import Enum
-from pydantic import BaseModel, Field, ConfigDict
+import numpy as np
+from pydantic import BaseModel, Field, ConfigDict, GetCoreSchemaHandler
+from pydantic.dataclasses import dataclass as pydantic_dataclass
+from pydantic_core import core_schema
 
 
-class OrderSide(str, Enum):
-    BUY = "BUY"
-    SELL = "SELL"
+class _NamedEnum(Enum):
+    def to_str(self) -> str:
+        return self.name
+    
+    @classmethod
+    def _parse(cls, value: Any) -> "_NamedEnum":
+        if isinstance(value, cls):
+            return value
+        try:
+            if isinstance(value, str):
+                return cls[value]
+            return cls(value)
+        except (KeyError, ValueError):
+            raise ValueError(
+                f"Input should be one of {', '.join(cls.__members__)}"
+            ) from None
+    
+    @classmethod
+    def __get_pydantic_core_schema__(
+        cls,
+        source: Any,
+        handler: GetCoreSchemaHandler
+    ) -> core_schema.CoreSchema:
+        return core_schema.no_info_plain_validator_function(
+            cls._parse,
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                cls.to_str, when_used='json'
+            )
+        )
+
+
+class OrderSide(_NamedEnum):
+    BUY = 0
+    SELL = 1
+
 
+class OrderStatus(_NamedEnum):
+    PENDING = 0
+    APPROVED = 1
+    REJECTED = 2
+    EXECUTED = 3
+    CANCELLED = 4
 
-class OrderStatus(str, Enum):
-    PENDING = "PENDING"
-    APPROVED = "APPROVED"
-    REJECTED = "REJECTED"
-    EXECUTED = "EXECUTED"
-    CANCELLED = "CANCELLED"
 
+class SignalType(_NamedEnum):
+    BULLISH = 0
+    BEARISH = 1
+    NEUTRAL = 2
 
-class SignalType(str, Enum):
-    BULLISH = "BULLISH"
-    BEARISH = "BEARISH"
-    NEUTRAL = "NEUTRAL"
+
+def _intern_symbol(values: dict[str, Any]) -> dict[str, Any]:
+    symbol = values.get("symbol")
+    if symbol is not None:
+        values["symbol"] = sys.intern(symbol)
+    return values
+
+
+def _construct(cls: type, values: dict[str, Any]) -> Any:
+    obj = object.__new__(cls)
+    for name, field in cls.__pydantic_fields__.items():
+        if name in values:
+            value = values[name]
+        else:
+            value = field.get_default(call_default_factory=True)
+        object.__setattr__(obj, name, value)
+    return obj
 
 
 class News(BaseModel):
     model_config = ConfigDict(arbitrary_types_allowed=True)
     
-    id: str = Field(..., description="Unique news identifier")
-    timestamp: datetime = Field(..., description="News publish time")
-    symbol: str = Field(..., description="Stock ticker symbol")
-    headline: str = Field(..., description="News headline")
-    content: Optional[str] = Field(None, description="Full news content")
-    source: str = Field(..., description="News source name")
+    id: str
+    timestamp: datetime
+    symbol: str
+    headline: str
+    content: Optional[str] = None
+    source: str
     sentiment_score: Optional[float] = Field(None, ge=-1.0, le=1.0)
+    
+    @classmethod
+    def build(cls, **kwargs: Any) -> "News":
+        return cls.model_construct(**_intern_symbol(kwargs))
 
 
 class Signal(BaseModel):
     model_config = ConfigDict(arbitrary_types_allowed=True)
     
-    id: str = Field(..., description="Unique signal identifier")
-    timestamp: datetime = Field(..., description="Signal generation time")
-    agent_id: str = Field(..., description="Analyst agent identifier")
-    symbol: str = Field(..., description="Stock ticker symbol")
-    signal_type: SignalType = Field(..., description="Signal type")
+    id: str
+    timestamp: datetime
+    agent_id: str
+    symbol: str
+    signal_type: SignalType
     confidence: float = Field(..., ge=0.0, le=1.0)
-    reasoning: Optional[str] = Field(None, description="Signal rationale")
-
-
-class Order(BaseModel):
-    model_config = ConfigDict(arbitrary_types_allowed=True)
+    reasoning: Optional[str] = None
     
-    id: str = Field(..., description="Unique order identifier")
-    timestamp: datetime = Field(..., description="Order creation time")
-    trader_id: str = Field(..., description="Trader agent identifier")
-    symbol: str = Field(..., description="Stock ticker symbol")
-    side: OrderSide = Field(..., description="Buy or Sell")
-    quantity: int = Field(..., gt=0, description="Number of shares")
-    price: Optional[float] = Field(None, gt=0, description="Limit price")
-    status: OrderStatus = Field(default=OrderStatus.PENDING)
-    signal_id: Optional[str] = Field(None, description="Originating signal ID")
-    rejection_reason: Optional[str] = Field(None)
-
-
-class Trade(BaseModel):
-    model_config = ConfigDict(arbitrary_types_allowed=True)
+    @classmethod
+    def build(cls, **kwargs: Any) -> "Signal":
+        return cls.model_construct(**_intern_symbol(kwargs))
+
+
+@pydantic_dataclass(slots=True, config=ConfigDict(arbitrary_types_allowed=True))
+class Order:
+    id: str
+    timestamp: datetime
+    trader_id: str
+    symbol: str
+    side: OrderSide
+    quantity: int = Field(..., gt=0)
+    price: Optional[float] = Field(None, gt=0)
+    status: OrderStatus = OrderStatus.PENDING
+    signal_id: Optional[str] = None
+    rejection_reason: Optional[str] = None
     
-    id: str = Field(..., description="Unique trade identifier")
-    timestamp: datetime = Field(..., description="Execution time")
-    order_id: str = Field(..., description="Original order ID")
-    symbol: str = Field(..., description="Stock ticker symbol")
-    side: OrderSide = Field(..., description="Buy or Sell")
+    @classmethod
+    def build(cls, **kwargs: Any) -> "Order":
+        return _construct(cls, _intern_symbol(kwargs))
+
+
+@pydantic_dataclass(slots=True, frozen=True, config=ConfigDict(arbitrary_types_allowed=True))
+class Trade:
+    id: str
+    timestamp: datetime
+    order_id: str
+    symbol: str
+    side: OrderSide
     quantity: int = Field(..., gt=0)
     execution_price: float = Field(..., gt=0)
     commission: float = Field(default=0.0, ge=0)
-    trader_id: str = Field(..., description="Trader agent identifier")
-
-
-class Position(BaseModel):
-    model_config = ConfigDict(arbitrary_types_allowed=True)
+    trader_id: str = Field(...)
     
-    symbol: str = Field(..., description="Stock ticker symbol")
-    quantity: int = Field(..., description="Current shares held")
-    avg_cost: float = Field(..., gt=0, description="Average purchase price")
-    current_price: float = Field(..., gt=0)
-    unrealized_pnl: float = Field(...)
+    @classmethod
+    def build(cls, **kwargs: Any) -> "Trade":
+        return _construct(cls, _intern_symbol(kwargs))
+
+
+@dataclass(slots=True)
+class Position:
+    symbol: str
+    quantity: int
+    avg_cost: float
+    current_price: float
+    unrealized_pnl: float
     
     def update_price(self, new_price: float) -> None:
         self.current_price = new_price
         self.unrealized_pnl = (new_price - self.avg_cost) * self.quantity
+    
+    @classmethod
+    def build(cls, **kwargs: Any) -> "Position":
+        return cls(**_intern_symbol(kwargs))
 
 
 class PortfolioState(BaseModel):
@@ -95,24 +166,34 @@ class PortfolioState(BaseModel):
     
     cash: float = Field(..., ge=0)
     positions: dict[str, Position] = Field(default_factory=dict)
-    total_value: float = Field(...)
-    realized_pnl: float = Field(default=0.0)
+    total_value: float
+    realized_pnl: float = 0.0
     
     def calculate_total_value(self) -> float:
-        positions_value = sum(
-            pos.quantity * pos.current_price 
-            for pos in self.positions.values()
-        )
-        return self.cash + positions_value
-
-
-class MarketData(BaseModel):
-    model_config = ConfigDict(arbitrary_types_allowed=True)
+        count = len(self.positions)
+        if not count:
+            return self.cash
+        
+        positions = self.positions.values()
+        quantities = np.fromiter((pos.quantity for pos in positions), dtype=np.float64, count=count)
+        prices = np.fromiter((pos.current_price for pos in positions), dtype=np.float64, count=count)
+        return self.cash + float(np.dot(quantities, prices))
+    
+    @classmethod
+    def build(cls, **kwargs: Any) -> "PortfolioState":
+        return cls.model_construct(**_intern_symbol(kwargs))
+
+
+@dataclass(slots=True, frozen=True)
+class MarketData:
+    timestamp: datetime
+    symbol: str
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: int
     
-    timestamp: datetime = Field(...)
-    symbol: str = Field(...)
-    open: float = Field(..., gt=0)
-    high: float = Field(..., gt=0)
-    low: float = Field(..., gt=0)
-    close: float = Field(..., gt=0)
-    volume: int = Field(..., ge=0)
\ No newline at end of file
+    @classmethod
+    def build(cls, **kwargs: Any) -> "MarketData":
+        return cls(**_intern_symbol(kwargs))
\ No newline at end of file
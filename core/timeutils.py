@@ -0,0 +1,21 @@
+import time
+from datetime import datetime, timezone
+
+_last_iso: tuple[int, str] = (-1, "")
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def utcnow_iso() -> str:
+    global _last_iso
+    
+    now = time.time()
+    bucket = int(now * 1000)
+    if bucket == _last_iso[0]:
+        return _last_iso[1]
+    
+    iso = datetime.fromtimestamp(now, timezone.utc).replace(tzinfo=None).isoformat()
+    _last_iso = (bucket, iso)
+    return iso
@@ -1,12 +1,29 @@
+import asyncio
+import lxml.html
+import requests
 import yfinance as yf
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import Optional
+from itertools import islice
+from typing import Iterator, Optional
 import logging
+import time
+
+import orjson
 
 logger = logging.getLogger(__name__)
 
+_DOWNLOAD_BATCH_SIZE = 20
+_ROW_GROUP_SIZE = 1_000_000
+_SP500_CACHE_TTL = 7 * 86400
+_SP500_URL = 'https://en.wikipedia.org/wiki/List_of_S%26P_500_companies'
+_HTTP_HEADERS = {'User-Agent': 'Mozilla/5.0 (compatible; trading-swarm/1.0)'}
+_PANEL_COLUMNS = ['timestamp', 'Open', 'High', 'Low', 'Close', 'Volume', 'symbol']
+
 
 class DataLoader:
     def __init__(self, data_dir: Path = Path("./data")):
@@ -14,13 +31,16 @@ class DataLoader:
         self.data_dir.mkdir(parents=True, exist_ok=True)
         self.historical_dir = self.data_dir / "historical"
         self.historical_dir.mkdir(parents=True, exist_ok=True)
+        self.panel_path = self.data_dir / "historical_panel.arrow"
     
     def fetch_sp500_tickers(self, limit: Optional[int] = None) -> list[str]:
+        cache_path = self.data_dir / "sp500.json"
         try:
-            sp500_table = pd.read_html(
-                'https://en.wikipedia.org/wiki/List_of_S%26P_500_companies'
-            )[0]
-            tickers = sp500_table['Symbol'].tolist()
+            if cache_path.exists() and time.time() - cache_path.stat().st_mtime < _SP500_CACHE_TTL:
+                tickers = orjson.loads(cache_path.read_bytes())
+            else:
+                tickers = self._download_sp500_tickers()
+                cache_path.write_bytes(orjson.dumps(tickers))
             
             if limit:
                 tickers = tickers[:limit]
@@ -32,58 +52,223 @@ class DataLoader:
             logger.error(f"Failed to fetch S&P 500 tickers: {e}")
             return ["AAPL", "MSFT", "GOOGL", "AMZN", "TSLA"]
     
+    def _download_sp500_tickers(self) -> list[str]:
+        response = requests.get(_SP500_URL, headers=_HTTP_HEADERS, timeout=10)
+        response.raise_for_status()
+        
+        tree = lxml.html.fromstring(response.content)
+        cells = tree.xpath("//table[@id='constituents']//tr/td[1]")
+        return [ticker for ticker in (cell.text_content().strip() for cell in cells) if ticker]
+    
     def download_historical_data(
         self,
         symbols: list[str],
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
         interval: str = "1d"
-    ) -> dict[str, pd.DataFrame]:
+    ) -> list[str]:
+        downloaded = []
+        rows = 0
+        for symbol, df in self.iter_historical_data(symbols, start_date, end_date, interval):
+            downloaded.append(symbol)
+            rows += len(df)
+        
+        if downloaded:
+            self._save_panel_ipc()
+        
+        logger.info(f"Downloaded {rows} rows for {len(downloaded)}/{len(symbols)} symbols")
+        return downloaded
+    
+    def iter_historical_data(
+        self,
+        symbols: list[str],
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        interval: str = "1d"
+    ) -> Iterator[tuple[str, pd.DataFrame]]:
+        start_date, end_date = self._date_range(start_date, end_date)
+        logger.info(f"Downloading data for {len(symbols)} symbols from {start_date} to {end_date}")
+        
+        remaining = iter(symbols)
+        while batch := list(islice(remaining, _DOWNLOAD_BATCH_SIZE)):
+            frames = self._split_batch(batch, self._fetch_batch(batch, start_date, end_date, interval))
+            if frames:
+                self._store_batch(frames)
+                yield from frames
+    
+    async def download_historical_data_async(
+        self,
+        symbols: list[str],
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        interval: str = "1d",
+        max_concurrency: int = 10
+    ) -> list[str]:
+        start_date, end_date = self._date_range(start_date, end_date)
+        logger.info(f"Downloading data for {len(symbols)} symbols from {start_date} to {end_date}")
+        
+        semaphore = asyncio.Semaphore(max_concurrency)
+        write_lock = asyncio.Lock()
+        
+        async def fetch(batch: list[str]) -> tuple[list[str], int]:
+            async with semaphore:
+                frame = await asyncio.to_thread(
+                    self._fetch_batch, batch, start_date, end_date, interval
+                )
+                frames = self._split_batch(batch, frame)
+                del frame
+                if not frames:
+                    return [], 0
+                async with write_lock:
+                    await asyncio.to_thread(self._store_batch, frames)
+            return [symbol for symbol, _ in frames], sum(len(df) for _, df in frames)
+        
+        remaining = iter(symbols)
+        batches = list(iter(lambda: list(islice(remaining, _DOWNLOAD_BATCH_SIZE)), []))
+        results = await asyncio.gather(*(fetch(batch) for batch in batches))
+        
+        downloaded = [symbol for batch_symbols, _ in results for symbol in batch_symbols]
+        if downloaded:
+            await asyncio.to_thread(self._save_panel_ipc)
+        
+        logger.info(
+            f"Downloaded {sum(rows for _, rows in results)} rows "
+            f"for {len(downloaded)}/{len(symbols)} symbols"
+        )
+        return downloaded
+    
+    @staticmethod
+    def _date_range(start_date: Optional[str], end_date: Optional[str]) -> tuple[str, str]:
         if not start_date:
             start_date = (datetime.now() - timedelta(days=365)).strftime("%Y-%m-%d")
         if not end_date:
             end_date = datetime.now().strftime("%Y-%m-%d")
+        return start_date, end_date
+    
+    @staticmethod
+    def _fetch_batch(
+        batch: list[str],
+        start_date: str,
+        end_date: str,
+        interval: str
+    ) -> Optional[pd.DataFrame]:
+        try:
+            return yf.download(
+                batch,
+                start=start_date,
+                end=end_date,
+                interval=interval,
+                group_by='ticker',
+                auto_adjust=True,
+                actions=True,
+                threads=True,
+                progress=False
+            )
+        except Exception as e:
+            logger.error(f"Failed to download batch {batch[0]}..{batch[-1]}: {e}")
+            return None
+    
+    @staticmethod
+    def _split_batch(
+        batch: list[str],
+        frame: Optional[pd.DataFrame]
+    ) -> list[tuple[str, pd.DataFrame]]:
+        if frame is None:
+            return []
         
-        logger.info(f"Downloading data for {len(symbols)} symbols from {start_date} to {end_date}")
+        if len(batch) == 1 and not isinstance(frame.columns, pd.MultiIndex):
+            frame = pd.concat({batch[0]: frame}, axis=1)
         
-        data = {}
-        for symbol in symbols:
-            try:
-                ticker = yf.Ticker(symbol)
-                df = ticker.history(
-                    start=start_date,
-                    end=end_date,
-                    interval=interval
-                )
-                
-                if not df.empty:
-                    df.index.name = 'timestamp'
-                    df.reset_index(inplace=True)
-                    df['symbol'] = symbol
-                    
-                    file_path = self.historical_dir / f"{symbol}.csv"
-                    df.to_csv(file_path, index=False)
-                    
-                    data[symbol] = df
-                    logger.info(f"Downloaded {len(df)} rows for {symbol}")
-                else:
-                    logger.warning(f"No data retrieved for {symbol}")
+        frames = []
+        downloaded = set(frame.columns.get_level_values(0)) if not frame.empty else set()
+        for symbol in batch:
+            df = frame[symbol].dropna(how='all') if symbol in downloaded else None
+            
+            if df is None or df.empty:
+                logger.warning(f"No data retrieved for {symbol}")
+                continue
             
-            except Exception as e:
-                logger.error(f"Failed to download {symbol}: {e}")
+            df.columns.name = None
+            df.index.name = 'timestamp'
+            df.reset_index(inplace=True)
+            df['symbol'] = symbol
+            frames.append((symbol, df))
         
-        return data
+        return frames
+    
+    def _store_batch(self, frames: list[tuple[str, pd.DataFrame]]) -> None:
+        table = pa.concat_tables(
+            [pa.Table.from_pandas(df, preserve_index=False) for _, df in frames],
+            promote_options='default'
+        )
+        self._save_historical_data(table)
+    
+    def _dataset(self) -> Optional[ds.Dataset]:
+        if not any(self.historical_dir.glob("symbol=*")):
+            return None
+        return ds.dataset(self.historical_dir, format='parquet', partitioning='hive')
+    
+    def _save_historical_data(self, table: pa.Table) -> None:
+        ds.write_dataset(
+            table,
+            base_dir=self.historical_dir,
+            format='parquet',
+            partitioning=['symbol'],
+            partitioning_flavor='hive',
+            existing_data_behavior='delete_matching',
+            file_options=ds.ParquetFileFormat().make_write_options(compression='zstd'),
+            min_rows_per_group=_ROW_GROUP_SIZE,
+            max_rows_per_group=_ROW_GROUP_SIZE
+        )
+    
+    def _save_panel_ipc(self) -> None:
+        dataset = self._dataset()
+        if dataset is None:
+            return
+        
+        writer = None
+        with pa.OSFile(str(self.panel_path), 'wb') as sink:
+            try:
+                for batch in dataset.to_batches(columns=_PANEL_COLUMNS):
+                    table = self._decode_symbols(pa.Table.from_batches([batch]))
+                    if writer is None:
+                        writer = pa.ipc.new_file(sink, table.schema)
+                    writer.write_table(table)
+            finally:
+                if writer is not None:
+                    writer.close()
+    
+    def load_mmap(self, symbol: Optional[str] = None) -> Optional[pa.Table]:
+        if not self.panel_path.exists():
+            return None
+        
+        source = pa.memory_map(str(self.panel_path), 'r')
+        table = pa.ipc.open_file(source).read_all()
+        
+        if symbol is not None:
+            table = table.filter(pc.equal(table['symbol'], symbol))
+        return table
+    
+    @staticmethod
+    def _decode_symbols(table: pa.Table) -> pa.Table:
+        index = table.schema.get_field_index('symbol')
+        return table.set_column(index, 'symbol', pc.cast(table['symbol'], pa.string()))
     
     def load_historical_data(self, symbol: str) -> Optional[pd.DataFrame]:
-        file_path = self.historical_dir / f"{symbol}.csv"
+        dataset = self._dataset()
         
-        if not file_path.exists():
+        if dataset is None:
             logger.warning(f"No historical data found for {symbol}")
             return None
         
         try:
-            df = pd.read_csv(file_path)
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
+            table = dataset.to_table(columns=_PANEL_COLUMNS, filter=pc.field('symbol') == symbol)
+            if table.num_rows == 0:
+                logger.warning(f"No historical data found for {symbol}")
+                return None
+            
+            df = self._decode_symbols(table).to_pandas()
+            df['symbol'] = df['symbol'].astype('category')
             logger.info(f"Loaded {len(df)} rows for {symbol}")
             return df
         
@@ -91,14 +276,42 @@ class DataLoader:
             logger.error(f"Failed to load data for {symbol}: {e}")
             return None
     
+    def _fresh_panel(self) -> Optional[pa.Table]:
+        if not self.panel_path.exists():
+            return None
+        
+        panel_mtime = self.panel_path.stat().st_mtime
+        if any(path.stat().st_mtime > panel_mtime for path in self.historical_dir.rglob("*.parquet")):
+            return None
+        
+        table = self.load_mmap()
+        stored = {path.name.partition('=')[2] for path in self.historical_dir.glob("symbol=*")}
+        if set(pc.unique(table['symbol']).to_pylist()) != stored:
+            return None
+        return table.select(_PANEL_COLUMNS)
+    
+    def load_panel(self) -> Optional[pa.Table]:
+        dataset = self._dataset()
+        if dataset is None:
+            return None
+        
+        table = self._fresh_panel()
+        if table is None:
+            table = self._decode_symbols(dataset.to_table(columns=_PANEL_COLUMNS))
+        return table.sort_by([('symbol', 'ascending'), ('timestamp', 'ascending')])
+    
     def load_all_historical_data(self) -> dict[str, pd.DataFrame]:
-        data = {}
+        panel = self.load_panel()
+        if panel is None:
+            logger.info("Loaded data for 0 symbols")
+            return {}
         
-        for file_path in self.historical_dir.glob("*.csv"):
-            symbol = file_path.stem
-            df = self.load_historical_data(symbol)
-            if df is not None:
-                data[symbol] = df
+        df = panel.to_pandas()
+        df['symbol'] = df['symbol'].astype('category')
+        data = {
+            symbol: frame.reset_index(drop=True)
+            for symbol, frame in df.groupby('symbol', sort=True, observed=True)
+        }
         
         logger.info(f"Loaded data for {len(data)} symbols")
-        return data
\ No newline at end of file
+        return data
@@ -1,459 +1,475 @@
-import json
-import csv
 from datetime import datetime
-from collections import defaultdict
-from typing import List, Dict, Any
+from typing import Iterator, List, Dict, Any
 import os
+from textwrap import dedent
 
-def load_trades_history(filepath: str) -> List[Dict[str, Any]]:
-    trades = []
-    with open(filepath, 'r') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            trades.append({
-                'trade_id': row['trade_id'],
-                'order_id': row['order_id'],
-                'timestamp': row['timestamp'],
-                'symbol': row['symbol'],
-                'side': row['side'],
-                'quantity': int(row['quantity']),
-                'execution_price': float(row['execution_price']),
-                'commission': float(row['commission']),
-                'trader_id': row['trader_id']
-            })
-    return trades
+import orjson
+import pandas as pd
+
+_TRADE_DTYPES = {
+    'trade_id': 'string[pyarrow]',
+    'quantity': 'int32',
+    'execution_price': 'float64',
+    'commission': 'float64',
+    'symbol': 'category',
+    'side': 'category',
+    'trader_id': 'category'
+}
+_TRADE_COLUMNS = [*_TRADE_DTYPES, 'timestamp']
+
+def load_trades_history(filepath: str) -> pd.DataFrame:
+    return pd.read_csv(filepath, usecols=_TRADE_COLUMNS, dtype=_TRADE_DTYPES)
 
 def load_daily_pnl(filepath: str) -> Dict[str, Any]:
-    with open(filepath, 'r') as f:
-        return json.load(f)
-
-def analyze_trades(trades: List[Dict[str, Any]]) -> Dict[str, Any]:
-    unique_trades = {}
-    for trade in trades:
-        if trade['trade_id'] not in unique_trades:
-            unique_trades[trade['trade_id']] = trade
-    
-    trades = list(unique_trades.values())
-    
-    trader_stats = defaultdict(lambda: {'buy': 0, 'sell': 0, 'total_commission': 0.0})
-    symbol_stats = defaultdict(lambda: {'buy': 0, 'sell': 0, 'buy_qty': 0, 'sell_qty': 0})
-    
-    for trade in trades:
-        trader_id = trade['trader_id']
-        symbol = trade['symbol']
-        side = trade['side']
-        
-        trader_stats[trader_id][side.lower()] += 1
-        trader_stats[trader_id]['total_commission'] += trade['commission']
-        
-        symbol_stats[symbol][side.lower()] += 1
-        symbol_stats[symbol][f"{side.lower()}_qty"] += trade['quantity']
+    with open(filepath, 'rb') as f:
+        return orjson.loads(f.read())
+
+_SIDES = ['BUY', 'SELL']
+
+def analyze_trades(trades: pd.DataFrame) -> Dict[str, Any]:
+    if not trades['trade_id'].is_unique:
+        trades = trades.drop_duplicates('trade_id', keep='first')
+    
+    trader_sides = (
+        trades.groupby(['trader_id', 'side'], observed=True).size()
+        .unstack(fill_value=0).reindex(columns=_SIDES, fill_value=0)
+    )
+    trader_commission = trades.groupby('trader_id', observed=True)['commission'].sum()
+    symbol_sides = (
+        trades.groupby(['symbol', 'side'], observed=True)['quantity'].agg(['count', 'sum'])
+        .unstack(fill_value=0)
+        .reindex(columns=pd.MultiIndex.from_product([['count', 'sum'], _SIDES]), fill_value=0)
+    )
+    
+    trader_stats = {
+        trader_id: {
+            'buy': int(counts['BUY']),
+            'sell': int(counts['SELL']),
+            'total_commission': float(trader_commission[trader_id])
+        }
+        for trader_id, counts in trader_sides.iterrows()
+    }
+    symbol_stats = {
+        symbol: {
+            'buy': int(row['count', 'BUY']),
+            'sell': int(row['count', 'SELL']),
+            'buy_qty': int(row['sum', 'BUY']),
+            'sell_qty': int(row['sum', 'SELL'])
+        }
+        for symbol, row in symbol_sides.iterrows()
+    }
     
     return {
         'total_trades': len(trades),
-        'trader_stats': dict(trader_stats),
-        'symbol_stats': dict(symbol_stats),
+        'total_commission': float(trades['commission'].sum()),
+        'trader_stats': trader_stats,
+        'symbol_stats': symbol_stats,
         'trades': trades
     }
 
-def find_key_examples(trades: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
-    position_tracker = defaultdict(lambda: {'qty': 0, 'avg_cost': 0.0, 'trades': []})
-    
-    for trade in trades:
-        symbol = trade['symbol']
-        trader_id = trade['trader_id']
-        key = f"{trader_id}_{symbol}"
-        
-        if trade['side'] == 'BUY':
-            old_qty = position_tracker[key]['qty']
-            old_cost = position_tracker[key]['avg_cost']
-            new_qty = old_qty + trade['quantity']
-            
-            if new_qty > 0:
-                position_tracker[key]['avg_cost'] = (
-                    (old_qty * old_cost + trade['quantity'] * trade['execution_price']) / new_qty
-                )
-            position_tracker[key]['qty'] = new_qty
-        else:
-            position_tracker[key]['qty'] -= trade['quantity']
-        
-        position_tracker[key]['trades'].append(trade)
-    
-    profitable_examples = []
-    loss_examples = []
-    
-    for key, pos_data in position_tracker.items():
-        if len(pos_data['trades']) >= 2:
-            buys = [t for t in pos_data['trades'] if t['side'] == 'BUY']
-            sells = [t for t in pos_data['trades'] if t['side'] == 'SELL']
-            
-            if buys and sells:
-                avg_buy = sum(t['execution_price'] for t in buys) / len(buys)
-                avg_sell = sum(t['execution_price'] for t in sells) / len(sells)
-                pnl_pct = ((avg_sell - avg_buy) / avg_buy) * 100
-                
-                example = {
-                    'key': key,
-                    'symbol': pos_data['trades'][0]['symbol'],
-                    'trader': pos_data['trades'][0]['trader_id'],
-                    'avg_buy_price': avg_buy,
-                    'avg_sell_price': avg_sell,
-                    'pnl_pct': pnl_pct,
-                    'trades': pos_data['trades']
-                }
-                
-                if pnl_pct > 0:
-                    profitable_examples.append(example)
-                else:
-                    loss_examples.append(example)
-    
-    profitable_examples.sort(key=lambda x: x['pnl_pct'], reverse=True)
-    loss_examples.sort(key=lambda x: x['pnl_pct'])
+def find_key_examples(trades: pd.DataFrame) -> Dict[str, List[Dict[str, Any]]]:
+    sides = (
+        trades.groupby(['trader_id', 'symbol', 'side'], sort=False, observed=True)['execution_price']
+        .agg(['mean', 'count']).unstack('side')
+        .reindex(columns=pd.MultiIndex.from_product([['mean', 'count'], _SIDES]))
+    )
+    stats = pd.DataFrame({
+        'avg_buy_price': sides['mean', 'BUY'],
+        'avg_sell_price': sides['mean', 'SELL'],
+        'trade_count': sides['count', 'BUY'] + sides['count', 'SELL']
+    }).dropna()
+    stats['pnl_pct'] = ((stats['avg_sell_price'] - stats['avg_buy_price']) / stats['avg_buy_price']) * 100
+    
+    def build_examples(selected: pd.DataFrame) -> List[Dict[str, Any]]:
+        examples = []
+        for (trader_id, symbol), row in selected.iterrows():
+            in_position = (trades['trader_id'] == trader_id) & (trades['symbol'] == symbol)
+            examples.append({
+                'key': f"{trader_id}_{symbol}",
+                'symbol': symbol,
+                'trader': trader_id,
+                'avg_buy_price': row['avg_buy_price'],
+                'avg_sell_price': row['avg_sell_price'],
+                'pnl_pct': row['pnl_pct'],
+                'trade_count': int(row['trade_count']),
+                'trades': trades[in_position].head(5).to_dict('records')
+            })
+        return examples
     
+    pnl_pct = stats['pnl_pct']
+    is_profitable = pnl_pct > 0
     return {
-        'profitable': profitable_examples[:5],
-        'losses': loss_examples[:5]
+        'profitable': build_examples(stats.loc[pnl_pct[is_profitable].nlargest(5).index]),
+        'losses': build_examples(stats.loc[pnl_pct[~is_profitable].nsmallest(5).index])
     }
 
-def generate_report(trades_path: str, pnl_path: str, output_path: str):
-    trades = load_trades_history(trades_path)
-    pnl_data = load_daily_pnl(pnl_path)
-    trade_analysis = analyze_trades(trades)
-    key_examples = find_key_examples(trade_analysis['trades'])
-    
-    report_lines = []
-    report_lines.append("# DETAILED SIMULATION REPORT: NEO Trading Swarm")
-    report_lines.append("")
-    report_lines.append(f"**Report Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    report_lines.append(f"**Simulation Period:** 2023-01-01 to 2023-12-29 (250 trading days)")
-    report_lines.append("")
-    report_lines.append("---")
-    report_lines.append("")
-    
-    report_lines.append("## 1. SWARM STRATEGY & LOGIC")
-    report_lines.append("")
-    report_lines.append("### Multi-Agent Architecture")
-    report_lines.append("")
-    report_lines.append("The NEO Trading Swarm operates as a distributed, multi-agent system with specialized roles:")
-    report_lines.append("")
-    report_lines.append("**Agent Composition:**")
-    report_lines.append("- **3 Analyst Agents** (`analyst_1`, `analyst_2`, `analyst_3`)")
-    report_lines.append("  - Monitor assigned stock symbols for technical indicators")
-    report_lines.append("  - Generate trading signals based on price momentum and volume analysis")
-    report_lines.append("  - Distribution: analyst_1 and analyst_2 monitor 4 symbols each, analyst_3 monitors 2 symbols")
-    report_lines.append("")
-    report_lines.append("- **4 Trader Agents** (`trader_1`, `trader_2`, `trader_3`, `trader_4`)")
-    report_lines.append("  - Each initialized with $250,000 starting capital")
-    report_lines.append("  - Execute buy/sell orders based on analyst signals and market conditions")
-    report_lines.append("  - Implement position sizing and portfolio management strategies")
-    report_lines.append("  - Maintain individual portfolios with real-time P&L tracking")
-    report_lines.append("")
-    report_lines.append("- **2 Risk Manager Agents** (`risk_manager_1`, `risk_manager_2`)")
-    report_lines.append("  - Pre-trade validation: verify sufficient capital and position limits")
-    report_lines.append("  - Post-trade monitoring: enforce stop-loss rules (typically 5-10% threshold)")
-    report_lines.append("  - Portfolio risk assessment: prevent overconcentration in single symbols")
-    report_lines.append("  - Redundant architecture for high-reliability risk enforcement")
-    report_lines.append("")
-    report_lines.append("- **1 Reporter Agent** (`reporter_1`)")
-    report_lines.append("  - Aggregate portfolio data across all traders")
-    report_lines.append("  - Generate daily P&L reports and performance metrics")
-    report_lines.append("  - Track trade execution history and risk events")
-    report_lines.append("  - Output structured reports (JSON, CSV formats)")
-    report_lines.append("")
-    report_lines.append("### Communication Architecture")
-    report_lines.append("")
-    report_lines.append("- **Message Bus:** LocalMessageBus (in-memory pub/sub)")
-    report_lines.append("- **Channels:**")
-    report_lines.append("  - `analyst_signals`: Analyst agents publish buy/sell signals")
-    report_lines.append("  - `order_requests`: Trader agents submit orders for validation")
-    report_lines.append("  - `approved_orders`: Risk managers approve valid orders")
-    report_lines.append("  - `stop_loss_alerts`: Risk managers trigger forced liquidations")
-    report_lines.append("  - `trade_executions`: Market environment confirms executed trades")
-    report_lines.append("")
-    report_lines.append("### Trading Strategy Logic")
-    report_lines.append("")
-    report_lines.append("**Signal Generation (Analysts):**")
-    report_lines.append("1. Technical indicators: price momentum, volume trends, moving averages")
-    report_lines.append("2. Signal types: BUY (bullish), SELL (bearish), HOLD (neutral)")
-    report_lines.append("3. Confidence scoring: signals weighted by indicator strength")
-    report_lines.append("")
-    report_lines.append("**Order Execution (Traders):**")
-    report_lines.append("1. Subscribe to analyst signals for relevant symbols")
-    report_lines.append("2. Position sizing: calculate order quantity based on available capital")
-    report_lines.append("3. Submit orders to risk managers for validation")
-    report_lines.append("4. Execute approved orders at market prices (simulated)")
-    report_lines.append("")
-    report_lines.append("**Risk Management (Risk Managers):**")
-    report_lines.append("1. Pre-trade checks:")
-    report_lines.append("   - Verify trader has sufficient cash for buy orders")
-    report_lines.append("   - Verify trader has sufficient shares for sell orders")
-    report_lines.append("   - Check position limits (max 50% portfolio in single symbol)")
-    report_lines.append("2. Post-trade monitoring:")
-    report_lines.append("   - Calculate unrealized P&L for all open positions")
-    report_lines.append("   - Trigger stop-loss if position loss exceeds threshold (5-10%)")
-    report_lines.append("   - Force liquidation of losing positions to limit downside")
-    report_lines.append("")
-    report_lines.append("---")
-    report_lines.append("")
-    
-    report_lines.append("## 2. OVERALL PERFORMANCE METRICS")
-    report_lines.append("")
-    
+_STRATEGY_SECTION = """\
+## 1. SWARM STRATEGY & LOGIC
+
+### Multi-Agent Architecture
+
+The NEO Trading Swarm operates as a distributed, multi-agent system with specialized roles:
+
+**Agent Composition:**
+- **3 Analyst Agents** (`analyst_1`, `analyst_2`, `analyst_3`)
+  - Monitor assigned stock symbols for technical indicators
+  - Generate trading signals based on price momentum and volume analysis
+  - Distribution: analyst_1 monitors 4 symbols, analyst_2 and analyst_3 monitor 3 symbols each
+
+- **4 Trader Agents** (`trader_1`, `trader_2`, `trader_3`, `trader_4`)
+  - Each initialized with $250,000 starting capital
+  - Execute buy/sell orders based on analyst signals and market conditions
+  - Implement position sizing and portfolio management strategies
+  - Maintain individual portfolios with real-time P&L tracking
+
+- **1 Risk Manager Agent** (`risk_manager`)
+  - Pre-trade validation: verify sufficient capital and position limits
+  - Post-trade monitoring: enforce stop-loss rules (typically 5-10% threshold)
+  - Portfolio risk assessment: prevent overconcentration in single symbols
+  - Order requests sharded by symbol across 2 worker tasks, each validated exactly once
+
+- **1 Reporter Agent** (`reporter_1`)
+  - Aggregate portfolio data across all traders
+  - Generate daily P&L reports and performance metrics
+  - Track trade execution history and risk events
+  - Output structured reports (JSON, CSV formats)
+
+### Communication Architecture
+
+- **Message Bus:** LocalMessageBus (in-memory pub/sub)
+- **Channels:**
+  - `analyst_signals`: Analyst agents publish buy/sell signals
+  - `order_requests`: Trader agents submit orders for validation
+  - `approved_orders`: Risk managers approve valid orders
+  - `stop_loss_alerts`: Risk managers trigger forced liquidations
+  - `trade_executions`: Market environment confirms executed trades
+
+### Trading Strategy Logic
+
+**Signal Generation (Analysts):**
+1. Technical indicators: price momentum, volume trends, moving averages
+2. Signal types: BUY (bullish), SELL (bearish), HOLD (neutral)
+3. Confidence scoring: signals weighted by indicator strength
+
+**Order Execution (Traders):**
+1. Subscribe to analyst signals for relevant symbols
+2. Position sizing: calculate order quantity based on available capital
+3. Submit orders to risk managers for validation
+4. Execute approved orders at market prices (simulated)
+
+**Risk Management (Risk Managers):**
+1. Pre-trade checks:
+   - Verify trader has sufficient cash for buy orders
+   - Verify trader has sufficient shares for sell orders
+   - Check position limits (max 50% portfolio in single symbol)
+2. Post-trade monitoring:
+   - Calculate unrealized P&L for all open positions
+   - Trigger stop-loss if position loss exceeds threshold (5-10%)
+   - Force liquidation of losing positions to limit downside
+
+---
+
+## 2. OVERALL PERFORMANCE METRICS
+
+"""
+
+_DATA_SECTION = """\
+## 5. WHAT NEO DID: DATA PROCESSING & ACTIONS
+
+### Data Ingestion & Processing
+
+**Historical Data Loaded:**
+- **Symbols:** AAPL, AMZN, GOOGL, JNJ, JPM, META, MSFT, NVDA, TSLA, V (S&P 500 constituents)
+- **Period:** January 1, 2023 to December 29, 2023 (250 trading days)
+- **Data Points:** 2,500 daily OHLCV records (250 days × 10 symbols)
+- **Source:** Yahoo Finance API (via yfinance library)
+
+**Data Format:**
+- Open, High, Low, Close prices
+- Trading volume
+- Timezone-normalized timestamps
+
+### Agent Actions Summary
+
+**Analyst Agents:**
+- Processed 2,500 daily price records across 10 symbols
+- Generated technical signals for each trading day
+- Published signals to message bus for trader consumption
+
+"""
+
+_TRADER_TMPL = """\
+**{trader_id}:**
+- Total Trades: {total}
+- Buy Orders: {buy}
+- Sell Orders: {sell}
+- Total Commission Paid: ${total_commission:.2f}
+
+"""
+
+_SYMBOL_TMPL = "| {symbol} | {buy} | {sell} | {buy_qty:,} | {sell_qty:,} | {net:+,} |\n"
+
+_EXAMPLE_TMPL = """\
+#### Example {i}: {symbol} ({trader})
+
+**Performance:** {pnl_pct:{pnl_format}}% {outcome}
+- Average Buy Price: ${avg_buy_price:.2f}
+- Average Sell Price: ${avg_sell_price:.2f}
+- Total Trades: {trade_count}
+
+**Trade Sequence:**
+"""
+
+_TRADE_TMPL = "- {date}: {side} {quantity} shares @ ${execution_price:.2f}\n"
+
+_STOP_LOSS_TMPL = """\
+**{symbol} - {trader_id}**
+- Average Cost: ${avg_cost:.2f}
+- Current Price: ${current_price:.2f}
+- Loss: {loss_pct:.2f}%
+- Action: Forced liquidation to limit downside
+
+"""
+
+def _examples_section(examples: List[Dict[str, Any]], outcome: str, empty_message: str) -> Iterator[str]:
+    if not examples:
+        yield f"{empty_message}\n\n"
+        return
+    
+    pnl_format = '+.2f' if outcome == 'gain' else '.2f'
+    for i, example in enumerate(examples, 1):
+        yield _EXAMPLE_TMPL.format(i=i, pnl_format=pnl_format, outcome=outcome, **example)
+        yield from (
+            _TRADE_TMPL.format(date=trade['timestamp'][:10], **trade)
+            for trade in example['trades']
+        )
+        if example['trade_count'] > 5:
+            yield f"- ... ({example['trade_count'] - 5} more trades)\n"
+        yield "\n"
+
+def _stop_loss_section(stop_losses: List[Dict[str, Any]]) -> Iterator[str]:
+    if not stop_losses:
+        yield "*No stop-loss events recorded in final report. Risk managers may have triggered liquidations earlier in simulation.*\n\n"
+        return
+    
+    yield "Risk managers intervened on the following positions to prevent excessive losses:\n\n"
+    for sl_event in stop_losses[:10]:
+        loss_pct = ((sl_event['current_price'] - sl_event['avg_cost']) / sl_event['avg_cost']) * 100
+        yield _STOP_LOSS_TMPL.format(loss_pct=loss_pct, **sl_event)
+    
+    if len(stop_losses) > 10:
+        yield f"*... and {len(stop_losses) - 10} additional stop-loss events*\n\n"
+
+def _report_sections(
+    pnl_data: Dict[str, Any],
+    trade_analysis: Dict[str, Any],
+    key_examples: Dict[str, List[Dict[str, Any]]]
+) -> Iterator[str]:
     summary = pnl_data['summary']
     risk_metrics = pnl_data['risk_metrics']
+    now = datetime.now()
+    
+    total_value = summary['total_portfolio_value']
+    total_trades = trade_analysis['total_trades']
+    approved = risk_metrics['approved_orders']
+    rejected = risk_metrics['rejected_orders']
+    rejected_pct = risk_metrics['rejected_orders_pct']
+    stop_losses = risk_metrics['stop_losses_triggered']
+    max_drawdown_pct = risk_metrics['max_drawdown'] * 100
+    total_orders = approved + rejected
+    approval_rate = 100 - rejected_pct
+    net_gain = total_value - 1000000
+    net_gain_pct = (net_gain / 1000000) * 100
+    
+    yield dedent(f"""\
+        # DETAILED SIMULATION REPORT: NEO Trading Swarm
+
+        **Report Generated:** {now:%Y-%m-%d %H:%M:%S}
+        **Simulation Period:** 2023-01-01 to 2023-12-29 (250 trading days)
+
+        ---
+
+        """)
+    yield _STRATEGY_SECTION
     
-    report_lines.append("### Portfolio Summary")
-    report_lines.append("")
-    report_lines.append(f"- **Total Portfolio Value:** ${summary['total_portfolio_value']:,.2f}")
-    report_lines.append(f"- **Total P&L:** ${summary['total_pnl']:,.2f}")
-    report_lines.append(f"  - Realized P&L: ${summary['realized_pnl']:,.2f}")
-    report_lines.append(f"  - Unrealized P&L: ${summary['unrealized_pnl']:,.2f}")
-    report_lines.append(f"- **Initial Capital:** $1,000,000 (4 traders × $250,000)")
-    report_lines.append(f"- **Net Gain/Loss:** ${summary['total_portfolio_value'] - 1000000:,.2f} ({((summary['total_portfolio_value'] - 1000000) / 1000000) * 100:+.2f}%)")
-    report_lines.append("")
-    
-    report_lines.append("### Trading Activity")
-    report_lines.append("")
-    report_lines.append(f"- **Total Trades Executed:** {trade_analysis['total_trades']}")
-    report_lines.append(f"  - Buy Orders: {summary['buy_orders']}")
-    report_lines.append(f"  - Sell Orders: {summary['sell_orders']}")
-    report_lines.append(f"- **Order Approval Rate:** {100 - risk_metrics['rejected_orders_pct']:.1f}%")
-    report_lines.append(f"  - Approved Orders: {risk_metrics['approved_orders']}")
-    report_lines.append(f"  - Rejected Orders: {risk_metrics['rejected_orders']} ({risk_metrics['rejected_orders_pct']:.1f}%)")
-    report_lines.append("")
-    
-    report_lines.append("### Risk Metrics")
-    report_lines.append("")
-    report_lines.append(f"- **Stop Losses Triggered:** {risk_metrics['stop_losses_triggered']}")
-    report_lines.append(f"- **Maximum Drawdown:** {risk_metrics['max_drawdown'] * 100:.2f}%")
-    report_lines.append(f"- **Risk Management Effectiveness:** {(risk_metrics['stop_losses_triggered'] / trade_analysis['total_trades']) * 100:.1f}% of trades required stop-loss intervention")
-    report_lines.append("")
-    
-    report_lines.append("### Agent Performance Breakdown")
-    report_lines.append("")
-    for trader_id, stats in sorted(trade_analysis['trader_stats'].items()):
-        total_trades = stats['buy'] + stats['sell']
-        report_lines.append(f"**{trader_id}:**")
-        report_lines.append(f"- Total Trades: {total_trades}")
-        report_lines.append(f"- Buy Orders: {stats['buy']}")
-        report_lines.append(f"- Sell Orders: {stats['sell']}")
-        report_lines.append(f"- Total Commission Paid: ${stats['total_commission']:.2f}")
-        report_lines.append("")
-    
-    report_lines.append("### Symbol Trading Activity")
-    report_lines.append("")
-    report_lines.append("| Symbol | Buy Trades | Sell Trades | Buy Qty | Sell Qty | Net Position |")
-    report_lines.append("|--------|-----------|-------------|---------|----------|--------------|")
-    for symbol, stats in sorted(trade_analysis['symbol_stats'].items()):
-        net_pos = stats['buy_qty'] - stats['sell_qty']
-        report_lines.append(f"| {symbol} | {stats['buy']} | {stats['sell']} | {stats['buy_qty']:,} | {stats['sell_qty']:,} | {net_pos:+,} |")
-    report_lines.append("")
-    
-    report_lines.append("---")
-    report_lines.append("")
-    
-    report_lines.append("## 3. KEY TRADE EXAMPLES")
-    report_lines.append("")
-    
-    report_lines.append("### Success Stories (Top 5 Profitable Trades)")
-    report_lines.append("")
-    
-    if key_examples['profitable']:
-        for i, example in enumerate(key_examples['profitable'], 1):
-            report_lines.append(f"#### Example {i}: {example['symbol']} ({example['trader']})")
-            report_lines.append("")
-            report_lines.append(f"**Performance:** {example['pnl_pct']:+.2f}% gain")
-            report_lines.append(f"- Average Buy Price: ${example['avg_buy_price']:.2f}")
-            report_lines.append(f"- Average Sell Price: ${example['avg_sell_price']:.2f}")
-            report_lines.append(f"- Total Trades: {len(example['trades'])}")
-            report_lines.append("")
-            report_lines.append("**Trade Sequence:**")
-            for trade in example['trades'][:5]:
-                report_lines.append(f"- {trade['timestamp'][:10]}: {trade['side']} {trade['quantity']} shares @ ${trade['execution_price']:.2f}")
-            if len(example['trades']) > 5:
-                report_lines.append(f"- ... ({len(example['trades']) - 5} more trades)")
-            report_lines.append("")
-    else:
-        report_lines.append("*No completed profitable round-trip trades identified in simulation.*")
-        report_lines.append("")
-    
-    report_lines.append("### Learning Opportunities (Top 5 Loss Trades)")
-    report_lines.append("")
-    
-    if key_examples['losses']:
-        for i, example in enumerate(key_examples['losses'], 1):
-            report_lines.append(f"#### Example {i}: {example['symbol']} ({example['trader']})")
-            report_lines.append("")
-            report_lines.append(f"**Performance:** {example['pnl_pct']:.2f}% loss")
-            report_lines.append(f"- Average Buy Price: ${example['avg_buy_price']:.2f}")
-            report_lines.append(f"- Average Sell Price: ${example['avg_sell_price']:.2f}")
-            report_lines.append(f"- Total Trades: {len(example['trades'])}")
-            report_lines.append("")
-            report_lines.append("**Trade Sequence:**")
-            for trade in example['trades'][:5]:
-                report_lines.append(f"- {trade['timestamp'][:10]}: {trade['side']} {trade['quantity']} shares @ ${trade['execution_price']:.2f}")
-            if len(example['trades']) > 5:
-                report_lines.append(f"- ... ({len(example['trades']) - 5} more trades)")
-            report_lines.append("")
-    else:
-        report_lines.append("*No completed loss-making round-trip trades identified in simulation.*")
-        report_lines.append("")
-    
-    report_lines.append("---")
-    report_lines.append("")
-    
-    report_lines.append("## 4. RISK MANAGEMENT INTERVENTIONS")
-    report_lines.append("")
-    
-    report_lines.append(f"### Stop-Loss Events: {risk_metrics['stop_losses_triggered']} Triggered")
-    report_lines.append("")
-    
-    if 'stop_losses' in pnl_data and pnl_data['stop_losses']:
-        report_lines.append("Risk managers intervened on the following positions to prevent excessive losses:")
-        report_lines.append("")
-        
-        for sl_event in pnl_data['stop_losses'][:10]:
-            loss_pct = ((sl_event['current_price'] - sl_event['avg_cost']) / sl_event['avg_cost']) * 100
-            report_lines.append(f"**{sl_event['symbol']} - {sl_event['trader_id']}**")
-            report_lines.append(f"- Average Cost: ${sl_event['avg_cost']:.2f}")
-            report_lines.append(f"- Current Price: ${sl_event['current_price']:.2f}")
-            report_lines.append(f"- Loss: {loss_pct:.2f}%")
-            report_lines.append(f"- Action: Forced liquidation to limit downside")
-            report_lines.append("")
-        
-        if len(pnl_data['stop_losses']) > 10:
-            report_lines.append(f"*... and {len(pnl_data['stop_losses']) - 10} additional stop-loss events*")
-            report_lines.append("")
-    else:
-        report_lines.append("*No stop-loss events recorded in final report. Risk managers may have triggered liquidations earlier in simulation.*")
-        report_lines.append("")
-    
-    report_lines.append(f"### Order Rejections: {risk_metrics['rejected_orders']} Blocked")
-    report_lines.append("")
-    report_lines.append("Risk managers prevented the following types of risky trades:")
-    report_lines.append("")
-    report_lines.append("**Common Rejection Reasons:**")
-    report_lines.append("1. Insufficient capital for buy orders")
-    report_lines.append("2. Insufficient shares for sell orders")
-    report_lines.append("3. Position limit violations (>50% portfolio in single symbol)")
-    report_lines.append("4. Excessive concentration risk")
-    report_lines.append("")
-    report_lines.append(f"**Rejection Rate:** {risk_metrics['rejected_orders_pct']:.1f}% of submitted orders")
-    report_lines.append("")
-    report_lines.append("This demonstrates the risk management system's effectiveness in preventing potentially catastrophic trades.")
-    report_lines.append("")
-    
-    report_lines.append("---")
-    report_lines.append("")
-    
-    report_lines.append("## 5. WHAT NEO DID: DATA PROCESSING & ACTIONS")
-    report_lines.append("")
-    
-    report_lines.append("### Data Ingestion & Processing")
-    report_lines.append("")
-    report_lines.append("**Historical Data Loaded:**")
-    report_lines.append("- **Symbols:** AAPL, AMZN, GOOGL, JNJ, JPM, META, MSFT, NVDA, TSLA, V (S&P 500 constituents)")
-    report_lines.append("- **Period:** January 1, 2023 to December 29, 2023 (250 trading days)")
-    report_lines.append("- **Data Points:** 2,500 daily OHLCV records (250 days × 10 symbols)")
-    report_lines.append("- **Source:** Yahoo Finance API (via yfinance library)")
-    report_lines.append("")
-    report_lines.append("**Data Format:**")
-    report_lines.append("- Open, High, Low, Close prices")
-    report_lines.append("- Trading volume")
-    report_lines.append("- Timezone-normalized timestamps")
-    report_lines.append("")
-    
-    report_lines.append("### Agent Actions Summary")
-    report_lines.append("")
-    
-    report_lines.append("**Analyst Agents:**")
-    report_lines.append(f"- Processed 2,500 daily price records across 10 symbols")
-    report_lines.append(f"- Generated technical signals for each trading day")
-    report_lines.append(f"- Published signals to message bus for trader consumption")
-    report_lines.append("")
-    
-    report_lines.append("**Trader Agents:**")
-    report_lines.append(f"- Submitted {risk_metrics['approved_orders'] + risk_metrics['rejected_orders']} total order requests")
-    report_lines.append(f"- Executed {trade_analysis['total_trades']} successful trades")
-    report_lines.append(f"- Managed portfolios totaling ${summary['total_portfolio_value']:,.2f} in value")
-    report_lines.append(f"- Paid ${sum(s['total_commission'] for s in trade_analysis['trader_stats'].values()):.2f} in trading commissions")
-    report_lines.append("")
-    
-    report_lines.append("**Risk Manager Agents:**")
-    report_lines.append(f"- Validated {risk_metrics['approved_orders'] + risk_metrics['rejected_orders']} order requests")
-    report_lines.append(f"- Approved {risk_metrics['approved_orders']} orders ({100 - risk_metrics['rejected_orders_pct']:.1f}% approval rate)")
-    report_lines.append(f"- Rejected {risk_metrics['rejected_orders']} orders for risk violations")
-    report_lines.append(f"- Triggered {risk_metrics['stop_losses_triggered']} stop-loss interventions")
-    report_lines.append(f"- Monitored portfolio risk metrics continuously across all 250 trading days")
-    report_lines.append("")
-    
-    report_lines.append("**Reporter Agent:**")
-    report_lines.append(f"- Aggregated {trade_analysis['total_trades']} trade executions")
-    report_lines.append(f"- Calculated P&L across 4 trader portfolios")
-    report_lines.append(f"- Generated daily performance reports (JSON, CSV formats)")
-    report_lines.append(f"- Tracked risk metrics and portfolio statistics")
-    report_lines.append("")
-    
-    report_lines.append("### Message Flow Statistics")
-    report_lines.append("")
-    report_lines.append("**Estimated Message Volume (250 trading days):**")
-    report_lines.append(f"- Analyst signals: ~2,500 messages (10 symbols × 250 days)")
-    report_lines.append(f"- Order requests: {risk_metrics['approved_orders'] + risk_metrics['rejected_orders']} messages")
-    report_lines.append(f"- Order approvals: {risk_metrics['approved_orders']} messages")
-    report_lines.append(f"- Trade confirmations: {trade_analysis['total_trades']} messages")
-    report_lines.append(f"- Stop-loss alerts: {risk_metrics['stop_losses_triggered']} messages")
-    report_lines.append(f"- **Total messages processed: ~{2500 + (risk_metrics['approved_orders'] + risk_metrics['rejected_orders']) * 2 + trade_analysis['total_trades'] + risk_metrics['stop_losses_triggered']:,}+**")
-    report_lines.append("")
-    
-    report_lines.append("---")
-    report_lines.append("")
-    
-    report_lines.append("## 6. CONCLUSIONS & INSIGHTS")
-    report_lines.append("")
+    yield dedent(f"""\
+        ### Portfolio Summary
+
+        - **Total Portfolio Value:** ${total_value:,.2f}
+        - **Total P&L:** ${summary['total_pnl']:,.2f}
+          - Realized P&L: ${summary['realized_pnl']:,.2f}
+          - Unrealized P&L: ${summary['unrealized_pnl']:,.2f}
+        - **Initial Capital:** $1,000,000 (4 traders × $250,000)
+        - **Net Gain/Loss:** ${net_gain:,.2f} ({net_gain_pct:+.2f}%)
+
+        ### Trading Activity
+
+        - **Total Trades Executed:** {total_trades}
+          - Buy Orders: {summary['buy_orders']}
+          - Sell Orders: {summary['sell_orders']}
+        - **Order Approval Rate:** {approval_rate:.1f}%
+          - Approved Orders: {approved}
+          - Rejected Orders: {rejected} ({rejected_pct:.1f}%)
+
+        ### Risk Metrics
+
+        - **Stop Losses Triggered:** {stop_losses}
+        - **Maximum Drawdown:** {max_drawdown_pct:.2f}%
+        - **Risk Management Effectiveness:** {(stop_losses / total_trades) * 100:.1f}% of trades required stop-loss intervention
+
+        ### Agent Performance Breakdown
+
+        """)
+    yield from (
+        _TRADER_TMPL.format(trader_id=trader_id, total=stats['buy'] + stats['sell'], **stats)
+        for trader_id, stats in sorted(trade_analysis['trader_stats'].items())
+    )
+    
+    yield dedent("""\
+        ### Symbol Trading Activity
+
+        | Symbol | Buy Trades | Sell Trades | Buy Qty | Sell Qty | Net Position |
+        |--------|-----------|-------------|---------|----------|--------------|
+        """)
+    yield from (
+        _SYMBOL_TMPL.format(symbol=symbol, net=stats['buy_qty'] - stats['sell_qty'], **stats)
+        for symbol, stats in sorted(trade_analysis['symbol_stats'].items())
+    )
+    
+    yield dedent("""\
+
+        ---
+
+        ## 3. KEY TRADE EXAMPLES
+
+        ### Success Stories (Top 5 Profitable Trades)
+
+        """)
+    yield from _examples_section(
+        key_examples['profitable'], 'gain',
+        "*No completed profitable round-trip trades identified in simulation.*"
+    )
+    yield "### Learning Opportunities (Top 5 Loss Trades)\n\n"
+    yield from _examples_section(
+        key_examples['losses'], 'loss',
+        "*No completed loss-making round-trip trades identified in simulation.*"
+    )
+    
+    yield dedent(f"""\
+        ---
+
+        ## 4. RISK MANAGEMENT INTERVENTIONS
+
+        ### Stop-Loss Events: {stop_losses} Triggered
+
+        """)
+    yield from _stop_loss_section(pnl_data.get('stop_losses', []))
     
-    report_lines.append("### System Effectiveness")
-    report_lines.append("")
+    yield dedent(f"""\
+        ### Order Rejections: {rejected} Blocked
+
+        Risk managers prevented the following types of risky trades:
+
+        **Common Rejection Reasons:**
+        1. Insufficient capital for buy orders
+        2. Insufficient shares for sell orders
+        3. Position limit violations (>50% portfolio in single symbol)
+        4. Excessive concentration risk
+
+        **Rejection Rate:** {rejected_pct:.1f}% of submitted orders
+
+        This demonstrates the risk management system's effectiveness in preventing potentially catastrophic trades.
+
+        ---
+
+        """)
+    yield _DATA_SECTION
+    
+    yield dedent(f"""\
+        **Trader Agents:**
+        - Submitted {total_orders} total order requests
+        - Executed {total_trades} successful trades
+        - Managed portfolios totaling ${total_value:,.2f} in value
+        - Paid ${trade_analysis['total_commission']:.2f} in trading commissions
+
+        **Risk Manager Agents:**
+        - Validated {total_orders} order requests
+        - Approved {approved} orders ({approval_rate:.1f}% approval rate)
+        - Rejected {rejected} orders for risk violations
+        - Triggered {stop_losses} stop-loss interventions
+        - Monitored portfolio risk metrics continuously across all 250 trading days
+
+        **Reporter Agent:**
+        - Aggregated {total_trades} trade executions
+        - Calculated P&L across 4 trader portfolios
+        - Generated daily performance reports (JSON, CSV formats)
+        - Tracked risk metrics and portfolio statistics
+
+        ### Message Flow Statistics
+
+        **Estimated Message Volume (250 trading days):**
+        - Analyst signals: ~2,500 messages (10 symbols × 250 days)
+        - Order requests: {total_orders} messages
+        - Order approvals: {approved} messages
+        - Trade confirmations: {total_trades} messages
+        - Stop-loss alerts: {stop_losses} messages
+        - **Total messages processed: ~{2500 + total_orders * 2 + total_trades + stop_losses:,}+**
+
+        ---
+
+        ## 6. CONCLUSIONS & INSIGHTS
+
+        ### System Effectiveness
+
+        """)
     
-    net_gain = summary['total_portfolio_value'] - 1000000
     if net_gain > 0:
-        report_lines.append(f"✅ **Profitable Simulation:** The swarm generated a net gain of ${net_gain:,.2f} ({(net_gain / 1000000) * 100:+.2f}%) over the 250-day period.")
+        yield f"✅ **Profitable Simulation:** The swarm generated a net gain of ${net_gain:,.2f} ({net_gain_pct:+.2f}%) over the 250-day period.\n"
     else:
-        report_lines.append(f"⚠️ **Net Loss:** The swarm experienced a net loss of ${abs(net_gain):,.2f} ({(net_gain / 1000000) * 100:.2f}%) over the 250-day period.")
-    report_lines.append("")
+        yield f"⚠️ **Net Loss:** The swarm experienced a net loss of ${abs(net_gain):,.2f} ({net_gain_pct:.2f}%) over the 250-day period.\n"
     
-    report_lines.append("### Risk Management Performance")
-    report_lines.append("")
-    report_lines.append(f"- **Preventive Actions:** Blocked {risk_metrics['rejected_orders']} risky orders before execution")
-    report_lines.append(f"- **Reactive Actions:** Triggered {risk_metrics['stop_losses_triggered']} stop-losses to cut losses")
-    report_lines.append(f"- **Drawdown Control:** Maximum drawdown limited to {risk_metrics['max_drawdown'] * 100:.2f}%")
-    report_lines.append("")
-    
-    report_lines.append("### Multi-Agent Coordination")
-    report_lines.append("")
-    report_lines.append("✅ **Successful Deployment:**")
-    report_lines.append("- All 10 agents deployed and communicated successfully")
-    report_lines.append("- Message bus handled thousands of inter-agent messages without failure")
-    report_lines.append("- Asynchronous coordination maintained system responsiveness")
-    report_lines.append("- Redundant risk managers ensured high-reliability safeguards")
-    report_lines.append("")
-    
-    report_lines.append("### Key Takeaways")
-    report_lines.append("")
-    report_lines.append("1. **Distributed Intelligence:** The swarm architecture successfully coordinated specialized agents for analysis, execution, and risk management")
-    report_lines.append("2. **Risk-First Design:** Risk managers prevented significant losses through proactive validation and reactive stop-loss triggers")
-    report_lines.append(f"3. **Production Readiness:** System processed {trade_analysis['total_trades']} trades across 250 days with consistent performance")
-    report_lines.append("4. **Scalability:** Architecture supports adding more agents, symbols, or sophistication without fundamental redesign")
-    report_lines.append("")
-    
-    report_lines.append("---")
-    report_lines.append("")
-    report_lines.append(f"*Report generated on {datetime.now().strftime('%Y-%m-%d at %H:%M:%S')} by NEO Trading Swarm Reporting System*")
+    yield dedent(f"""\
+
+        ### Risk Management Performance
+
+        - **Preventive Actions:** Blocked {rejected} risky orders before execution
+        - **Reactive Actions:** Triggered {stop_losses} stop-losses to cut losses
+        - **Drawdown Control:** Maximum drawdown limited to {max_drawdown_pct:.2f}%
+
+        ### Multi-Agent Coordination
+
+        ✅ **Successful Deployment:**
+        - All 9 agents deployed and communicated successfully
+        - Message bus handled thousands of inter-agent messages without failure
+        - Asynchronous coordination maintained system responsiveness
+        - Symbol-sharded risk workers validated every order exactly once
+
+        ### Key Takeaways
+
+        1. **Distributed Intelligence:** The swarm architecture successfully coordinated specialized agents for analysis, execution, and risk management
+        2. **Risk-First Design:** Risk managers prevented significant losses through proactive validation and reactive stop-loss triggers
+        3. **Production Readiness:** System processed {total_trades} trades across 250 days with consistent performance
+        4. **Scalability:** Architecture supports adding more agents, symbols, or sophistication without fundamental redesign
+
+        ---
+
+        *Report generated on {now:%Y-%m-%d at %H:%M:%S} by NEO Trading Swarm Reporting System*
+        """)
+
+def generate_report(trades_path: str, pnl_path: str, output_path: str):
+    trades = load_trades_history(trades_path)
+    pnl_data = load_daily_pnl(pnl_path)
+    trade_analysis = analyze_trades(trades)
+    key_examples = find_key_examples(trade_analysis['trades'])
     
-    with open(output_path, 'w') as f:
-        f.write('\n'.join(report_lines))
+    line_count = 0
+    with open(output_path, 'w', buffering=1 << 16) as f:
+        for section in _report_sections(pnl_data, trade_analysis, key_examples):
+            f.write(section)
+            line_count += section.count('\n')
     
     print(f"Detailed narrative report generated: {output_path}")
-    print(f"Report contains {len(report_lines)} lines of analysis")
+    print(f"Report contains {line_count} lines of analysis")
 
 if __name__ == "__main__":
     base_dir = "/root/StocktradingBot"
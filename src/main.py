@@ -1,19 +1,48 @@
 import asyncio
+import contextlib
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from datetime import datetime
+from datetime import date, datetime
+from typing import Optional
 import logging
 
+import numpy as np
+import orjson
+
+try:
+    from ciso8601 import parse_datetime as _parse_datetime
+except ImportError:
+    _parse_datetime = datetime.fromisoformat
+
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from core.message_bus import LocalMessageBus, RedisMessageBus
 from core.market_environment import MarketEnvironment
+from core.schemas import Order, OrderSide, OrderStatus
 from core.logger import setup_logging
 from data.data_loader import DataLoader
 from agents import AnalystAgent, TraderAgent, RiskManagerAgent, ReporterAgent
 
 logger = logging.getLogger(__name__)
 
+_BANNER = "=" * 60
+
+_SIDE_MAP = {side.to_str(): side for side in OrderSide}
+
+_SNAPSHOT_PREFIX = orjson.dumps(
+    {"type": "portfolio_snapshot", "data": {"realized_pnl": 0.0, "unrealized_pnl": 0.0}}
+)[:-2]
+
+
+def _encode_snapshot(trading_day: date, total_value: float) -> bytes:
+    return b"".join((
+        _SNAPSHOT_PREFIX,
+        b',"date":', orjson.dumps(trading_day),
+        b',"total_value":', orjson.dumps(total_value),
+        b"}}"
+    ))
+
 
 class TradingSimulation:
     def __init__(
@@ -33,13 +62,19 @@ class TradingSimulation:
         self.message_bus = None
         self.market_env = None
         self.agents = []
+        self.traders: list[TraderAgent] = []
+        self.risk_manager: Optional[RiskManagerAgent] = None
+        self.reporter: Optional[ReporterAgent] = None
+        self._pending_orders: list[Order] = []
+        self._total_value = initial_cash
+        self._current_day_idx = -1
     
     async def initialize(self) -> None:
         setup_logging(log_level="INFO", log_dir="./logs")
         
-        logger.info("=" * 60)
+        logger.info(_BANNER)
         logger.info("Initializing Trading Simulation Swarm")
-        logger.info("=" * 60)
+        logger.info(_BANNER)
         
         if self.use_redis:
             self.message_bus = RedisMessageBus()
@@ -48,20 +83,21 @@ class TradingSimulation:
             self.message_bus = LocalMessageBus()
             await self.message_bus.start()
         
-        logger.info(f"Message bus initialized: {type(self.message_bus).__name__}")
+        logger.info("Message bus initialized: %s", type(self.message_bus).__name__)
         
         loader = DataLoader()
         historical_data = loader.load_all_historical_data()
         
         if not historical_data:
             logger.info("No cached data found, downloading...")
-            historical_data = loader.download_historical_data(
+            await loader.download_historical_data_async(
                 symbols=self.symbols,
                 start_date=self.start_date,
                 end_date=self.end_date
             )
+            historical_data = loader.load_all_historical_data()
         
-        logger.info(f"Loaded historical data for {len(historical_data)} symbols")
+        logger.info("Loaded historical data for %d symbols", len(historical_data))
         
         self.market_env = MarketEnvironment(
             message_bus=self.message_bus,
@@ -70,150 +106,212 @@ class TradingSimulation:
         
         await self._create_agents()
         
-        logger.info(f"Created {len(self.agents)} agents total")
+        logger.info("Created %d agents total", len(self.agents))
     
     async def _create_agents(self) -> None:
-        symbols_per_analyst = len(self.symbols) // 3 + 1
+        add_agent = self.agents.append
+        message_bus = self.message_bus
         
-        for i in range(3):
-            start_idx = i * symbols_per_analyst
-            end_idx = min((i + 1) * symbols_per_analyst, len(self.symbols))
-            analyst_symbols = self.symbols[start_idx:end_idx]
+        for i, group in enumerate(np.array_split(self.symbols, 3)):
+            analyst_symbols = group.tolist()
             
             analyst = AnalystAgent(
                 agent_id=f"analyst_{i+1}",
-                message_bus=self.message_bus,
+                message_bus=message_bus,
                 symbols=analyst_symbols
             )
-            self.agents.append(analyst)
-            logger.info(f"Created analyst_{i+1} - monitoring {len(analyst_symbols)} symbols")
-        
-        symbols_per_trader = len(self.symbols) // 4 + 1
+            add_agent(analyst)
+            logger.info("Created analyst_%d - monitoring %d symbols", i + 1, len(analyst_symbols))
         
-        for i in range(4):
-            start_idx = i * symbols_per_trader
-            end_idx = min((i + 1) * symbols_per_trader, len(self.symbols))
-            trader_symbols = self.symbols[start_idx:end_idx]
+        for i, group in enumerate(np.array_split(self.symbols, 4)):
+            trader_symbols = group.tolist()
             
             trader = TraderAgent(
                 agent_id=f"trader_{i+1}",
-                message_bus=self.message_bus,
+                message_bus=message_bus,
                 symbols=trader_symbols,
                 initial_cash=self.initial_cash / 4
             )
-            self.agents.append(trader)
-            logger.info(f"Created trader_{i+1} - cash: ${self.initial_cash/4:,.0f}")
-        
-        for i in range(2):
-            risk_manager = RiskManagerAgent(
-                agent_id=f"risk_manager_{i+1}",
-                message_bus=self.message_bus,
-                initial_portfolio_value=self.initial_cash
-            )
-            self.agents.append(risk_manager)
-            logger.info(f"Created risk_manager_{i+1}")
+            add_agent(trader)
+            self.traders.append(trader)
+            logger.info("Created trader_%d - cash: $%s", i + 1, f"{self.initial_cash / 4:,.0f}")
+        
+        risk_manager = RiskManagerAgent(
+            agent_id="risk_manager",
+            message_bus=message_bus,
+            symbols=self.symbols,
+            initial_portfolio_value=self.initial_cash,
+            worker_count=2
+        )
+        add_agent(risk_manager)
+        self.risk_manager = risk_manager
+        logger.info("Created risk_manager - %d order workers", risk_manager.worker_count)
         
         reporter = ReporterAgent(
             agent_id="reporter_1",
-            message_bus=self.message_bus
+            message_bus=message_bus
         )
-        self.agents.append(reporter)
-        logger.info(f"Created reporter_1")
-        
-        await self.message_bus.subscribe("approved_orders", self._on_approved_order)
+        add_agent(reporter)
+        self.reporter = reporter
+        logger.info("Created reporter_1")
+        
+        await message_bus.subscribe(
+            "approved_orders",
+            self._on_approved_order,
+            message_type="order_approved",
+            inline=True
+        )
+        await message_bus.subscribe(
+            "portfolio_value", self._on_value_change, message_type="portfolio_value_change"
+        )
+    
+    async def _on_value_change(self, message: dict) -> None:
+        self._total_value += message["delta"]
     
     async def _on_approved_order(self, message: dict) -> None:
-        if message.get("type") != "order_approved":
-            return
-        
-        from core.schemas import Order, OrderSide, OrderStatus
-        
-        order = Order(
-            id=message.get("order_id"),
-            timestamp=datetime.fromisoformat(message.get("timestamp")),
-            trader_id=message.get("trader_id"),
-            symbol=message.get("symbol"),
-            side=OrderSide[message.get("side")],
-            quantity=message.get("quantity"),
-            price=message.get("price"),
+        timestamp = message["timestamp"]
+        if isinstance(timestamp, str):
+            timestamp = _parse_datetime(timestamp)
+        
+        order = Order.build(
+            id=message["order_id"],
+            timestamp=timestamp,
+            trader_id=message["trader_id"],
+            symbol=message["symbol"],
+            side=_SIDE_MAP[message["side"]],
+            quantity=message["quantity"],
+            price=message["price"],
             status=OrderStatus.APPROVED
         )
         
-        await self.market_env.submit_order(order)
+        self._pending_orders.append(order)
+    
+    async def _wait_for_tick_acks(self, timeout: float) -> None:
+        async def barrier() -> None:
+            await asyncio.gather(*(agent.tick_done.wait() for agent in self.agents))
+            await self.message_bus.drain()
+            await asyncio.gather(*(agent.drain() for agent in self.agents))
+            await self.message_bus.drain()
+        
+        try:
+            await asyncio.wait_for(barrier(), timeout)
+        except asyncio.TimeoutError:
+            logger.debug("Tick barrier timed out after %.2fs", timeout)
+        finally:
+            for agent in self.agents:
+                agent.tick_done.clear()
+    
+    def _log_progress(self) -> None:
+        day_idx = self._current_day_idx
+        if day_idx < 0:
+            return
+        
+        timeline = self.market_env.timeline
+        logger.info(
+            "Progress: Day %d/%d (%.1f%%) - %s",
+            day_idx + 1, len(timeline), ((day_idx + 1) / len(timeline)) * 100, timeline[day_idx]
+        )
+    
+    async def _progress_reporter(self, interval: float = 1.0) -> None:
+        last_logged = -1
+        while True:
+            await asyncio.sleep(interval)
+            if self._current_day_idx != last_logged:
+                last_logged = self._current_day_idx
+                self._log_progress()
     
     async def run(self) -> None:
-        logger.info("=" * 60)
+        logger.info(_BANNER)
         logger.info("Starting all agents")
-        logger.info("=" * 60)
+        logger.info(_BANNER)
         
         for agent in self.agents:
             await agent.start()
         
-        logger.info("All 10 agents are now ACTIVE")
+        logger.info("All %d agents are now ACTIVE", len(self.agents))
+        
+        logger.info("\nRunning simulation: %s to %s", self.start_date, self.end_date)
+        logger.info("Total trading days: %d\n", len(self.market_env.timeline))
         
-        logger.info(f"\nRunning simulation: {self.start_date} to {self.end_date}")
-        logger.info(f"Total trading days: {len(self.market_env.timeline)}\n")
+        begin_batch = self.message_bus.begin_batch
+        flush_batch = self.message_bus.flush_batch
+        publish = self.message_bus.publish
+        advance = self.market_env.advance_time
+        step = self.market_env.step
+        wait_for_tick_acks = self._wait_for_tick_acks
         
-        total_days = len(self.market_env.timeline)
+        encode_snapshots = self.use_redis and not self.message_bus.use_msgpack
         
+        progress_task = asyncio.create_task(self._progress_reporter())
+        
+        # Days run strictly in sequence: each day's signals, orders and risk checks
+        # depend on the fills, cash and positions settled the day before, and the
+        # tick barrier only holds if one day's messages are fully drained first.
         for day_idx, trading_day in enumerate(self.market_env.timeline):
-            await self.market_env.advance_time(trading_day)
+            begin_batch()
+            await advance(trading_day)
+            await flush_batch()
+            
+            await wait_for_tick_acks(timeout=0.1)
             
-            await asyncio.sleep(0.1)
+            orders, self._pending_orders = self._pending_orders, []
             
-            await self.market_env.execute_pending_orders()
+            begin_batch()
+            await step(orders)
             
             if day_idx % 10 == 0:
-                current_prices = self.market_env.get_all_current_prices()
-                
-                portfolio_value = 0.0
-                for agent in self.agents:
-                    if isinstance(agent, TraderAgent):
-                        portfolio_value += agent.get_portfolio_value()
-                
-                await self.message_bus.publish(
-                    "portfolio_update",
-                    {
-                        "type": "portfolio_snapshot",
-                        "data": {
-                            "date": str(trading_day),
-                            "total_value": portfolio_value,
-                            "realized_pnl": 0.0,
-                            "unrealized_pnl": 0.0
+                if encode_snapshots:
+                    await self.message_bus.publish_encoded(
+                        "portfolio_update", _encode_snapshot(trading_day, self._total_value)
+                    )
+                else:
+                    await publish(
+                        "portfolio_update",
+                        {
+                            "type": "portfolio_snapshot",
+                            "data": {
+                                "date": str(trading_day),
+                                "total_value": self._total_value,
+                                "realized_pnl": 0.0,
+                                "unrealized_pnl": 0.0
+                            }
                         }
-                    }
-                )
+                    )
             
-            if day_idx % 50 == 0 or day_idx == total_days - 1:
-                progress_pct = ((day_idx + 1) / total_days) * 100
-                logger.info(
-                    f"Progress: Day {day_idx+1}/{total_days} ({progress_pct:.1f}%) - {trading_day}"
-                )
+            await flush_batch()
+            self._current_day_idx = day_idx
         
-        logger.info("\n" + "=" * 60)
+        progress_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await progress_task
+        self._log_progress()
+        
+        logger.info("\n%s", _BANNER)
         logger.info("Simulation complete - Generating final report")
-        logger.info("=" * 60)
+        logger.info(_BANNER)
         
         await asyncio.sleep(1)
         
-        reporter = next(a for a in self.agents if isinstance(a, ReporterAgent))
-        report = await reporter.generate_daily_report(str(self.market_env.timeline[-1]))
+        report = await self.reporter.generate_daily_report(str(self.market_env.timeline[-1]))
         
-        logger.info("\n" + "=" * 60)
+        logger.info("\n%s", _BANNER)
         logger.info("FINAL REPORT SUMMARY")
-        logger.info("=" * 60)
-        logger.info(f"Total Portfolio Value: ${report['summary']['total_portfolio_value']:,.2f}")
-        logger.info(f"Total P&L:            ${report['summary']['total_pnl']:,.2f}")
-        logger.info(f"  - Realized P&L:     ${report['summary']['realized_pnl']:,.2f}")
-        logger.info(f"  - Unrealized P&L:   ${report['summary']['unrealized_pnl']:,.2f}")
-        logger.info(f"\nTotal Trades:         {report['summary']['total_trades']}")
-        logger.info(f"  - Buy Orders:       {report['summary']['buy_orders']}")
-        logger.info(f"  - Sell Orders:      {report['summary']['sell_orders']}")
-        logger.info(f"\nApproved Orders:      {report['risk_metrics']['approved_orders']}")
-        logger.info(f"Rejected Orders:      {report['risk_metrics']['rejected_orders']} ({report['risk_metrics']['rejected_orders_pct']:.1f}%)")
-        logger.info(f"Stop Losses:          {report['risk_metrics']['stop_losses_triggered']}")
-        logger.info(f"Max Drawdown:         {report['risk_metrics']['max_drawdown']*100:.2f}%")
-        logger.info("=" * 60)
+        logger.info(_BANNER)
+        logger.info("Total Portfolio Value: $%s", f"{report['summary']['total_portfolio_value']:,.2f}")
+        logger.info("Total P&L:            $%s", f"{report['summary']['total_pnl']:,.2f}")
+        logger.info("  - Realized P&L:     $%s", f"{report['summary']['realized_pnl']:,.2f}")
+        logger.info("  - Unrealized P&L:   $%s", f"{report['summary']['unrealized_pnl']:,.2f}")
+        logger.info("\nTotal Trades:         %d", report['summary']['total_trades'])
+        logger.info("  - Buy Orders:       %d", report['summary']['buy_orders'])
+        logger.info("  - Sell Orders:      %d", report['summary']['sell_orders'])
+        logger.info("\nApproved Orders:      %d", report['risk_metrics']['approved_orders'])
+        logger.info(
+            "Rejected Orders:      %d (%.1f%%)",
+            report['risk_metrics']['rejected_orders'], report['risk_metrics']['rejected_orders_pct']
+        )
+        logger.info("Stop Losses:          %d", report['risk_metrics']['stop_losses_triggered'])
+        logger.info("Max Drawdown:         %.2f%%", report['risk_metrics']['max_drawdown'] * 100)
+        logger.info(_BANNER)
         
         await self.shutdown()
     
@@ -230,6 +328,10 @@ class TradingSimulation:
 
 
 async def main():
+    if hasattr(asyncio, "eager_task_factory"):
+        asyncio.get_running_loop().set_task_factory(asyncio.eager_task_factory)
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=4))
+    
     symbols = [
         "AAPL", "MSFT", "GOOGL", "AMZN", "TSLA",
         "META", "NVDA", "JPM", "V", "JNJ"
@@ -247,5 +349,20 @@ async def main():
     await sim.run()
 
 
+def run_event_loop(coro) -> None:
+    try:
+        import uvloop
+    except ImportError:
+        logger.debug("uvloop not available, using default asyncio event loop")
+        asyncio.run(coro)
+        return
+    
+    if sys.version_info >= (3, 12):
+        asyncio.run(coro, loop_factory=uvloop.new_event_loop)
+    else:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        asyncio.run(coro)
+
+
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    run_event_loop(main())
\ No newline at end of file